@@ -36,11 +36,11 @@ class TestReadmeExamples:
         yield
         clear_memories()
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_simple_query_flow(
         self,
         mock_load_memories,
@@ -81,11 +81,11 @@ class TestReadmeExamples:
         # This should not crash
         handle_query_with_tools("what's in my git status?", mock_config)
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_install_flow(
         self,
         mock_load_memories,
@@ -120,11 +120,11 @@ class TestReadmeExamples:
 
         handle_query_with_tools("install express", mock_config)
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_undo_flow(
         self,
         mock_load_memories,
@@ -181,11 +181,11 @@ class TestToolBasedWorkflow:
             }
         }
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_multi_step_with_internal_tools(
         self,
         mock_load_memories,
@@ -229,11 +229,175 @@ class TestToolBasedWorkflow:
 
         handle_query_with_tools("install dependencies", mock_config)
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.conversation.history.append_to_history')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
+    def test_streamed_text_is_not_parsed_as_markup(
+        self,
+        mock_load_memories,
+        mock_env,
+        mock_git,
+        mock_history,
+        mock_ai,
+        mock_append_history,
+        mock_config
+    ):
+        """Test that brackets split across streamed lines print as-is."""
+        import io
+        from rich.console import Console
+
+        mock_history.return_value = ([], None)
+        mock_git.return_value = None
+        mock_env.return_value = {'cwd': '/test'}
+        mock_load_memories.return_value = {}
+
+        def fake_query(**kwargs):
+            kwargs['on_text']("Use [bold]this\n")
+            kwargs['on_text']("and that[/bold] ok\n")
+            return {'response': "", 'tool_calls': [], 'iterations': 1}
+
+        mock_ai.side_effect = fake_query
+        output = io.StringIO()
+        with patch('wtf.cli.console', Console(file=output, width=100)):
+            handle_query_with_tools("test", mock_config)
+
+        text = output.getvalue()
+        assert "Use [bold]this\nand that[/bold] ok" in text
+
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
+    def test_partial_stream_is_shown_on_error(
+        self,
+        mock_load_memories,
+        mock_env,
+        mock_git,
+        mock_history,
+        mock_ai,
+        mock_config
+    ):
+        """Test that text streamed before a failure is still printed."""
+        import io
+        from rich.console import Console
+
+        mock_history.return_value = ([], None)
+        mock_git.return_value = None
+        mock_env.return_value = {'cwd': '/test'}
+        mock_load_memories.return_value = {}
+
+        def fake_query(**kwargs):
+            kwargs['on_text']("Half an answ")
+            raise RuntimeError("connection reset")
+
+        mock_ai.side_effect = fake_query
+        output = io.StringIO()
+        with patch('wtf.cli.console', Console(file=output, width=100)):
+            handle_query_with_tools("test", mock_config)
+
+        text = output.getvalue()
+        assert text.index("Half an answ") < text.index("connection reset")
+
+    @patch('wtf.ai.tools.start_prefetch')
+    @patch('wtf.core.permissions.load_denylist')
+    @patch('wtf.core.permissions.load_allowlist')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
+    def test_prefetch_respects_denylist(
+        self,
+        mock_load_memories,
+        mock_env,
+        mock_git,
+        mock_history,
+        mock_ai,
+        mock_allowlist,
+        mock_denylist,
+        mock_prefetch,
+        mock_config
+    ):
+        """Test that denylisted commands are never run speculatively."""
+        mock_history.return_value = ([], None)
+        mock_git.return_value = {'branch': 'main', 'has_changes': False}
+        mock_env.return_value = {'cwd': '/test'}
+        mock_load_memories.return_value = {}
+        mock_allowlist.return_value = []
+        mock_denylist.return_value = ['git log']
+        mock_ai.return_value = {'response': 'Done.', 'tool_calls': [], 'iterations': 1}
+
+        with patch('wtf.cli.console'):
+            handle_query_with_tools("what changed?", mock_config)
+
+        prefetched = mock_prefetch.call_args[0][0]
+        assert 'git diff --stat' in prefetched
+        assert 'git log -5' not in prefetched
+
+    @patch('wtf.conversation.history.append_to_history')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
+    def test_streams_output_as_it_arrives(
+        self,
+        mock_load_memories,
+        mock_env,
+        mock_git,
+        mock_history,
+        mock_ai,
+        mock_append_history,
+        mock_config
+    ):
+        """Test that tool output and response text are shown in arrival order."""
+        import io
+        from rich.console import Console
+
+        mock_history.return_value = ([], None)
+        mock_git.return_value = None
+        mock_env.return_value = {'cwd': '/test', 'project_type': 'python'}
+        mock_load_memories.return_value = {}
+
+        tool_call = {
+            'name': 'run_command',
+            'arguments': {'command': 'git status'},
+            'result': {'output': 'On branch main', 'exit_code': 0, 'should_print': True}
+        }
+
+        def fake_query(**kwargs):
+            kwargs['on_text']("Let me check.")
+            kwargs['on_text']("\n")
+            kwargs['on_tool_call'](tool_call)
+            kwargs['on_text']("All clean")
+            kwargs['on_text'](", nothing to commit.")
+            return {
+                'response': "Let me check.\nAll clean, nothing to commit.",
+                'tool_calls': [tool_call],
+                'iterations': 2
+            }
+
+        mock_ai.side_effect = fake_query
+        output = io.StringIO()
+        with patch('wtf.cli.console', Console(file=output, width=100)):
+            handle_query_with_tools("is my tree clean?", mock_config)
+
+        text = output.getvalue()
+        assert text.index("Let me check.") < text.index("$ git status")
+        assert text.index("│ On branch main") < text.index("All clean, nothing to commit.")
+        # Streamed text isn't printed a second time
+        assert text.count("All clean") == 1
+        assert mock_append_history.call_args[0][0]['commands'] == ['git status']
+
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_iterative_smart_commit(
         self,
         mock_load_memories,
@@ -300,11 +464,11 @@ class TestContextGathering:
             }
         }
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_uses_shell_history(
         self,
         mock_load_memories,
@@ -335,11 +499,11 @@ class TestContextGathering:
         # Verify history was requested
         mock_history.assert_called_once()
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_uses_git_context(
         self,
         mock_load_memories,
@@ -370,11 +534,11 @@ class TestContextGathering:
         # Verify git status was requested
         mock_git.assert_called_once()
 
-    @patch('wtf.cli.query_ai_with_tools')
-    @patch('wtf.cli.get_shell_history')
-    @patch('wtf.cli.get_git_status')
-    @patch('wtf.cli.get_environment_context')
-    @patch('wtf.cli.load_memories')
+    @patch('wtf.ai.client.query_ai_with_tools')
+    @patch('wtf.context.shell.get_shell_history')
+    @patch('wtf.context.git.get_git_status')
+    @patch('wtf.context.env.get_environment_context')
+    @patch('wtf.conversation.memory.load_memories')
     def test_uses_memories(
         self,
         mock_load_memories,
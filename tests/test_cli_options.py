@@ -58,6 +58,29 @@ class TestCLIFlags:
         assert result.returncode == 0
         assert "wtf" in result.stdout.lower()
 
+    def test_version_does_not_load_rich(self):
+        """Test: wtf --version prints without importing rich"""
+        code = (
+            "import sys\n"
+            "sys.argv = ['wtf', '--version']\n"
+            "from wtf.cli import main\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print('rich' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == 0
+        version_line, rich_loaded = result.stdout.splitlines()
+        assert version_line.startswith("wtf ")
+        assert rich_loaded == "False"
+
     def test_config_flag(self):
         """Test: wtf --config"""
         result = subprocess.run(
@@ -251,3 +274,128 @@ class TestQueryHandling:
         # Should either show help or setup wizard
         # Not crash with parse error
         assert "parse" not in result.stderr.lower()
+
+
+class TestArgumentParsing:
+    """Test the argument parser directly."""
+
+    def test_flags_and_query(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments(["--verbose", "why", "did", "that", "fail"])
+        assert args.verbose is True
+        assert args.help is False
+        assert args.query == ["why", "did", "that", "fail"]
+
+    def test_flags_after_query(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments(["why", "--verbose", "again"])
+        assert args.verbose is True
+        assert args.query == ["why", "again"]
+
+    def test_aliases(self):
+        from wtf.cli import _parse_arguments
+        assert _parse_arguments(["-h"]).help is True
+        assert _parse_arguments(["-v"]).version is True
+        assert _parse_arguments(["--update"]).upgrade is True
+
+    def test_unique_prefixes(self):
+        from wtf.cli import _parse_arguments
+        assert _parse_arguments(["--verb"]).verbose is True
+        assert _parse_arguments(["--upg"]).upgrade is True
+        assert _parse_arguments(["--conf"]).config is True
+        assert _parse_arguments(["--mod=gpt-4"]).model == "gpt-4"
+
+    def test_ambiguous_prefix(self, capsys):
+        from wtf.cli import _parse_arguments
+        with pytest.raises(SystemExit) as exc:
+            _parse_arguments(["--up"])
+        assert exc.value.code == 2
+        assert "ambiguous option: --up could match --upgrade, --update" in capsys.readouterr().err
+
+    def test_combined_short_flags(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments(["-hv"])
+        assert args.help is True
+        assert args.version is True
+
+    def test_value_flags(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments(["--model", "gpt-4", "--provider=openai", "hi"])
+        assert args.model == "gpt-4"
+        assert args.provider == "openai"
+        assert args.query == ["hi"]
+
+    def test_value_flags_default_to_none(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments([])
+        assert args.model is None
+        assert args.provider is None
+        assert args.query == []
+
+    def test_double_dash_ends_flags(self):
+        from wtf.cli import _parse_arguments
+        args = _parse_arguments(["--", "what", "does", "--force", "do"])
+        assert args.query == ["what", "does", "--force", "do"]
+
+    def test_negative_numbers_are_query(self):
+        from wtf.cli import _parse_arguments
+        assert _parse_arguments(["exit", "code", "-1"]).query == ["exit", "code", "-1"]
+
+    def test_unknown_flag_exits(self, capsys):
+        from wtf.cli import _parse_arguments
+        with pytest.raises(SystemExit) as exc:
+            _parse_arguments(["--bogus"])
+        assert exc.value.code == 2
+        assert "unrecognized arguments: --bogus" in capsys.readouterr().err
+
+    def test_value_flag_needs_value(self, capsys):
+        from wtf.cli import _parse_arguments
+        with pytest.raises(SystemExit) as exc:
+            _parse_arguments(["--model", "--help"])
+        assert exc.value.code == 2
+        assert "expected one argument" in capsys.readouterr().err
+
+
+class TestHelpRendering:
+    """Test the cached help output."""
+
+    def test_help_rendered_once(self, capsys):
+        from wtf.cli import print_help, _rendered_help
+        _rendered_help.cache_clear()
+
+        print_help()
+        first = capsys.readouterr().out
+        print_help()
+        second = capsys.readouterr().out
+
+        assert first == second
+        assert "USAGE:" in first
+        assert "[bold]" not in first
+        assert _rendered_help.cache_info().misses == 1
+
+
+class TestFastPrint:
+    """Test plain status lines written without rich markup."""
+
+    def test_plain_when_not_a_terminal(self):
+        import io
+        from unittest.mock import patch
+        from rich.console import Console
+        from wtf.cli import _fast_print
+
+        output = io.StringIO()
+        with patch('wtf.cli.console', Console(file=output)):
+            _fast_print()
+            _fast_print("Thinking [not markup]", "dim")
+        assert output.getvalue() == "\nThinking [not markup]\n"
+
+    def test_styled_on_a_color_terminal(self):
+        import io
+        from unittest.mock import patch
+        from rich.console import Console
+        from wtf.cli import _fast_print
+
+        output = io.StringIO()
+        with patch('wtf.cli.console', Console(file=output, force_terminal=True, color_system="standard")):
+            _fast_print("Thinking...", "dim")
+        assert output.getvalue() == "\033[2mThinking...\033[0m\n"
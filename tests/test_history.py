@@ -43,6 +43,21 @@ def test_append_to_history(temp_history_dir):
     history_path = Path(temp_history_dir) / "history.jsonl"
     assert history_path.exists()
 
+
+def test_append_to_history_finishes_short_writes(temp_history_dir, monkeypatch):
+    """Test an entry is written in full even if os.write comes up short."""
+    from wtf.conversation import history as history_module
+
+    real_write = os.write
+    monkeypatch.setattr(history_module.os, 'write',
+                        lambda fd, data: real_write(fd, data[:5]))
+
+    append_to_history({"query": "test query", "response": "test response"})
+
+    history_path = Path(temp_history_dir) / "history.jsonl"
+    entry = json.loads(history_path.read_text())
+    assert entry["response"] == "test response"
+
     with open(history_path, 'r') as f:
         lines = f.readlines()
         assert len(lines) == 1
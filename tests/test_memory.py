@@ -27,6 +27,39 @@ def temp_config_dir(monkeypatch):
         yield tmpdir
 
 
+def test_load_memories_returns_copy(temp_config_dir):
+    """Test that mutating loaded memories doesn't affect later loads."""
+    save_memory("editor", "emacs")
+
+    memories = load_memories()
+    memories["shell"] = {"value": "zsh"}
+
+    assert "shell" not in load_memories()
+
+
+def test_load_memories_returns_nested_copy(temp_config_dir):
+    """Test that editing a loaded memory's fields doesn't change the cache."""
+    save_memory("editor", "emacs")
+
+    memories = load_memories()
+    memories["editor"]["value"] = "vim"
+
+    assert load_memories()["editor"]["value"] == "emacs"
+
+
+def test_load_memories_sees_external_changes(temp_config_dir):
+    """Test that a file rewritten outside wtf is re-read."""
+    save_memory("editor", "emacs")
+    assert load_memories()["editor"]["value"] == "emacs"
+
+    memory_path = Path(temp_config_dir) / "memories.json"
+    memory_path.write_text(json.dumps({"editor": {"value": "vim"}, "shell": {"value": "zsh"}}))
+
+    memories = load_memories()
+    assert memories["editor"]["value"] == "vim"
+    assert "shell" in memories
+
+
 def test_save_memory(temp_config_dir):
     """Test saving a memory."""
     save_memory("editor", "emacs", confidence=0.9)
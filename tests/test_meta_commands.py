@@ -255,3 +255,48 @@ class TestMemoryOperations:
 
         assert isinstance(memories, dict)
         assert len(memories) == 0
+
+
+class TestParseMemoryFact:
+    """Test guessing memory keys from "remember" facts."""
+
+    def test_use_editor(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("use emacs") == ("editor", "emacs")
+        assert _parse_memory_fact("use nvim") == ("editor", "nvim")
+
+    def test_use_editor_variant(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("use gvim") == ("editor", "gvim")
+        assert _parse_memory_fact("use emacsclient") == ("editor", "emacsclient")
+        assert _parse_memory_fact("use vimdiff for merges") == ("editor", "vimdiff for merges")
+
+    def test_use_package_manager(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("use yarn") == ("package_manager", "yarn")
+
+    def test_use_python_version(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("use python3.11") == ("python_version", "python3.11")
+
+    def test_priority_when_several_match(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("use bash with vim") == ("editor", "bash with vim")
+
+    def test_tool_before_use_is_not_the_value(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("with npm use exact versions") == ("with_npm", "exact versions")
+        assert _parse_memory_fact("when in vim use relative numbers") == ("when_in_vim", "relative numbers")
+        assert _parse_memory_fact("for zsh use starship prompt") == ("for_zsh", "starship prompt")
+
+    def test_category_word_anywhere(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("as my editor use helix") == ("editor", "helix")
+
+    def test_unknown_uses_prefix_as_key(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("for tests use pytest") == ("for_tests", "pytest")
+
+    def test_prefer(self):
+        from wtf.cli import _parse_memory_fact
+        assert _parse_memory_fact("prefer tabs over spaces") == ("preference", "tabs")
@@ -16,6 +16,7 @@ from wtf.core.permissions import (
     prompt_for_permission,
     add_to_allowlist,
     load_allowlist,
+    load_denylist,
 )
 
 
@@ -348,6 +349,33 @@ class TestLoadAllowlist:
                 result = load_allowlist()
                 assert result == []
 
+    def test_allowlist_and_denylist_share_one_parse(self) -> None:
+        """Test that loading both lists from an unchanged file parses it once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            allowlist_path = Path(tmpdir) / 'allowlist.json'
+            with open(allowlist_path, 'w') as f:
+                json.dump({'patterns': ['make'], 'denylist': ['sudo']}, f)
+
+            with patch('wtf.core.permissions.get_allowlist_path', return_value=allowlist_path):
+                with patch('wtf.core.permissions.json.load', wraps=json.load) as mock_load:
+                    assert load_allowlist() == ['make']
+                    assert load_denylist() == ['sudo']
+                    assert mock_load.call_count == 1
+
+    def test_load_allowlist_sees_file_changes(self) -> None:
+        """Test that an edited allowlist file is re-read."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            allowlist_path = Path(tmpdir) / 'allowlist.json'
+            with open(allowlist_path, 'w') as f:
+                json.dump({'patterns': ['make']}, f)
+
+            with patch('wtf.core.permissions.get_allowlist_path', return_value=allowlist_path):
+                assert load_allowlist() == ['make']
+
+                with open(allowlist_path, 'w') as f:
+                    json.dump({'patterns': ['make', 'cargo build']}, f)
+                assert load_allowlist() == ['make', 'cargo build']
+
 
 class TestPermissionIntegration:
     """Integration tests for the full permission flow."""
@@ -0,0 +1,48 @@
+"""Tests for system prompt building."""
+
+import tempfile
+import shutil
+from pathlib import Path
+import pytest
+
+from wtf.ai.prompts import build_system_prompt
+
+
+@pytest.fixture
+def temp_config_dir(monkeypatch):
+    """Create a temporary config directory for testing."""
+    temp_dir = tempfile.mkdtemp()
+    monkeypatch.setenv('XDG_CONFIG_HOME', temp_dir)
+    config_dir = Path(temp_dir) / 'wtf'
+    config_dir.mkdir()
+    yield config_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_system_prompt_without_wtf_md(temp_config_dir):
+    """Test the prompt has no custom section when wtf.md is missing."""
+    prompt = build_system_prompt()
+    assert prompt.startswith("You are wtf")
+    assert "UNDO REQUESTS:" in prompt
+    assert "CUSTOM USER INSTRUCTIONS" not in prompt
+
+
+def test_system_prompt_includes_custom_instructions(temp_config_dir):
+    """Test instructions from wtf.md are appended to the prompt."""
+    (temp_config_dir / 'wtf.md').write_text("Always use fish syntax.\n")
+    prompt = build_system_prompt()
+    assert prompt.endswith("\n\nCUSTOM USER INSTRUCTIONS:\nAlways use fish syntax.")
+    assert build_system_prompt() is prompt
+
+
+def test_system_prompt_sees_wtf_md_changes(temp_config_dir):
+    """Test an edited wtf.md is picked up on the next call."""
+    wtf_md = temp_config_dir / 'wtf.md'
+    wtf_md.write_text("Be terse.")
+    assert build_system_prompt().endswith("Be terse.")
+
+    wtf_md.write_text("Be extremely verbose.")
+    assert build_system_prompt().endswith("Be extremely verbose.")
+
+    wtf_md.unlink()
+    assert "CUSTOM USER INSTRUCTIONS" not in build_system_prompt()
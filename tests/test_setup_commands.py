@@ -94,6 +94,14 @@ class TestSetupCommandDetection:
         assert result is True
         mock_setup.assert_called_once()
 
+    @patch('wtf.cli.run_setup_wizard')
+    @patch('wtf.cli.console')
+    def test_reset_configs(self, mock_console, mock_setup):
+        """Test: wtf reset my configs"""
+        result = handle_setup_command("reset my configs")
+        assert result is True
+        mock_setup.assert_called_once()
+
     @patch('wtf.cli.run_setup_wizard')
     @patch('wtf.cli.console')
     def test_reset_settings(self, mock_console, mock_setup):
@@ -139,6 +147,11 @@ class TestNonSetupCommands:
         result = handle_setup_command("change your personality")
         assert result is False
 
+    def test_keywords_inside_other_words(self):
+        """Test: keywords must be whole words ("to" in "automatically")"""
+        result = handle_setup_command("how do I switch tabs automatically in tmux")
+        assert result is False
+
     def test_cli_flag_not_detected(self):
         """Test: --setup flag should not trigger natural language handler"""
         # CLI flags are handled separately
@@ -1,10 +1,14 @@
 """Tests for shell context gathering."""
 
 import pytest
+from unittest.mock import patch
+
+import wtf.context.shell as shell_module
 from wtf.context.shell import (
     detect_shell,
     parse_zsh_history_line,
     parse_bash_history_line,
+    read_history_file,
     HistoryFailureReason,
 )
 
@@ -16,6 +20,18 @@ def test_detect_shell():
     assert shell in ['zsh', 'bash', 'fish', 'unknown']
 
 
+def test_detect_shell_is_cached():
+    """Test that shell detection runs once per process."""
+    detect_shell.cache_clear()
+    try:
+        with patch.dict('os.environ', {'SHELL': '/bin/zsh'}):
+            assert detect_shell() == 'zsh'
+        with patch.dict('os.environ', {'SHELL': '/bin/bash'}):
+            assert detect_shell() == 'zsh'
+    finally:
+        detect_shell.cache_clear()
+
+
 def test_parse_zsh_history_line():
     """Test parsing zsh history format."""
     # Extended format
@@ -47,3 +63,36 @@ def test_history_failure_reason_enum():
     assert HistoryFailureReason.PERMISSION_DENIED
     assert HistoryFailureReason.HISTORY_DISABLED
     assert HistoryFailureReason.EMPTY_HISTORY
+
+
+def test_read_history_file_tail(tmp_path):
+    """Test that only the end of a large history file is needed."""
+    history_file = tmp_path / ".bash_history"
+    lines = [f"echo command-{i}" for i in range(20000)]
+    history_file.write_text("\n".join(lines) + "\n")
+    assert history_file.stat().st_size > shell_module.HISTORY_TAIL_BYTES
+
+    commands = read_history_file(str(history_file), "bash", 3)
+    assert commands == ["echo command-19997", "echo command-19998", "echo command-19999"]
+
+
+def test_read_history_file_small(tmp_path):
+    """Test reading a history file smaller than the tail size."""
+    history_file = tmp_path / ".zsh_history"
+    history_file.write_text(": 1234567890:0;git status\n: 1234567891:0;git diff\n")
+
+    assert read_history_file(str(history_file), "zsh", 5) == ["git status", "git diff"]
+
+
+def test_read_history_file_cached_until_changed(tmp_path):
+    """Test that an unchanged history file is not parsed again."""
+    history_file = tmp_path / ".bash_history"
+    history_file.write_text("ls\npwd\n")
+
+    assert read_history_file(str(history_file), "bash", 5) == ["ls", "pwd"]
+    with patch.object(shell_module, "parse_history_lines") as mock_parse:
+        assert read_history_file(str(history_file), "bash", 5) == ["ls", "pwd"]
+    mock_parse.assert_not_called()
+
+    history_file.write_text("ls\npwd\nwhoami\n")
+    assert read_history_file(str(history_file), "bash", 5) == ["ls", "pwd", "whoami"]
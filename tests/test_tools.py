@@ -17,7 +17,10 @@ from wtf.ai.tools import (
     TOOLS,
     get_tool_definitions,
     UserCancelledError,
+    start_prefetch,
+    clear_prefetch,
 )
+import wtf.ai.tools as tools_module
 
 
 class TestRunCommand:
@@ -54,6 +57,100 @@ class TestRunCommand:
         assert result["should_print"] is True
 
 
+class TestRunCommandPrefetch:
+    """Tests for speculative prefetching of run_command results."""
+
+    @pytest.fixture(autouse=True)
+    def skip_permissions(self):
+        """Skip permission prompts and reset the prefetch cache."""
+        os.environ['WTF_SKIP_PERMISSIONS'] = '1'
+        yield
+        os.environ.pop('WTF_SKIP_PERMISSIONS', None)
+        clear_prefetch()
+
+    def test_prefetched_result_is_reused(self):
+        """A matching command is answered without running it again."""
+        start_prefetch(["echo prefetched"])
+
+        with patch('wtf.ai.tools.subprocess.run') as mock_run:
+            result = run_command("echo prefetched")
+
+        mock_run.assert_not_called()
+        assert "prefetched" in result["output"]
+        assert result["exit_code"] == 0
+
+    def test_prefetched_result_used_once(self):
+        """Each prefetched result is only handed out once."""
+        start_prefetch(["echo once"])
+        run_command("echo once")
+
+        with patch('wtf.ai.tools.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout="again", stderr="", returncode=0)
+            result = run_command("echo once")
+
+        mock_run.assert_called_once()
+        assert result["output"] == "again"
+
+    def test_stale_prefetch_is_ignored(self):
+        """Results older than PREFETCH_MAX_AGE are re-run."""
+        start_prefetch(["echo stale"])
+
+        with patch.object(tools_module, 'PREFETCH_MAX_AGE', -1), \
+                patch('wtf.ai.tools.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout="fresh", stderr="", returncode=0)
+            result = run_command("echo stale")
+
+        assert result["output"] == "fresh"
+
+    def test_write_command_discards_prefetch(self):
+        """A command that may modify files invalidates prefetched results."""
+        start_prefetch(["echo cached"])
+
+        with patch('wtf.ai.tools.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout="", stderr="", returncode=0)
+            run_command("touch /tmp/wtf_prefetch_test")
+            run_command("echo cached")
+
+        assert mock_run.call_count == 2
+
+    @pytest.mark.skipif(os.name != "posix", reason="uses POSIX shell and signals")
+    def test_clear_prefetch_stops_running_command(self, tmp_path):
+        """Clearing stops a running prefetch instead of waiting it out."""
+        pid_file = tmp_path / "pid"
+        start_prefetch([f"echo $$ > {pid_file}; exec sleep 30"])
+        self._wait_for_file(pid_file)
+        pid = int(pid_file.read_text())
+
+        clear_prefetch()
+
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    @pytest.mark.skipif(os.name != "posix", reason="uses POSIX shell and signals")
+    def test_clear_prefetch_lets_command_clean_up(self, tmp_path):
+        """A stopped prefetch gets SIGTERM first, so it can remove lock files."""
+        ready_file = tmp_path / "ready"
+        cleanup_file = tmp_path / "cleaned"
+        start_prefetch([
+            f"trap 'echo done > {cleanup_file}; exit 0' TERM; "
+            f"echo ready > {ready_file}; while :; do sleep 0.05; done"
+        ])
+        self._wait_for_file(ready_file)
+
+        clear_prefetch()
+
+        assert cleanup_file.read_text().strip() == "done"
+
+    @staticmethod
+    def _wait_for_file(path):
+        import time
+        for _ in range(500):
+            if path.exists() and path.stat().st_size > 0:
+                return
+            time.sleep(0.01)
+        pytest.fail(f"prefetch never wrote {path}")
+
+
 class TestReadFile:
     """Tests for read_file tool."""
 
@@ -2,15 +2,13 @@
 
 import os
 import sys
-from typing import Iterator, Union, Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any
 import llm
 
 from wtf.ai.errors import (
     NetworkError,
     InvalidAPIKeyError,
-    RateLimitError,
     parse_api_error,
-    query_ai_with_retry,
 )
 from wtf.ai.tools import TOOLS, get_tool_definitions, detect_native_search_support
 
@@ -20,6 +18,20 @@ class StuckLoopError(Exception):
     pass
 
 
+# Tool descriptions for progress messages
+_TOOL_PROGRESS_MESSAGES = {
+    "duckduckgo_search": "🔍 Searching the web...",
+    "tavily_search": "🔍 Searching the web...",
+    "serper_search": "🔍 Searching the web...",
+    "brave_search": "🔍 Searching the web...",
+    "bing_search": "🔍 Searching the web...",
+    "read_file": "📄 Reading file...",
+    "run_command": "⚡ Running command...",
+    "grep": "🔎 Searching files...",
+    "glob_files": "📂 Finding files...",
+    "get_git_info": "📊 Checking git status...",
+}
+
 
 def query_ai_with_tools(
     prompt: str,
@@ -27,7 +39,9 @@ def query_ai_with_tools(
     system_prompt: Optional[str] = None,
     model: Optional[str] = None,
     max_iterations: int = 20,
-    env_context: Optional[Dict[str, Any]] = None
+    env_context: Optional[Dict[str, Any]] = None,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> Dict[str, Any]:
     """
     Query AI with tool support - agent can use tools in a loop.
@@ -48,6 +62,10 @@ def query_ai_with_tools(
         model: Optional model override
         max_iterations: Max tool call loops (default: 20)
         env_context: Optional environment context for tool filtering
+        on_text: Optional callback for response text as it streams in. Before
+            tool progress is shown it gets "\n" if a line is still open.
+        on_tool_call: Optional callback for each tool call (same dict as in
+            tool_calls) as soon as the tool finishes
 
     Returns:
         Dict with:
@@ -104,7 +122,7 @@ def query_ai_with_tools(
             raise InvalidAPIKeyError(
                 f"API key not configured for model '{configured_model}'. "
                 f"Set environment variable or use: llm keys set <provider>",
-                provider=configured_model.split("-")[0] if "-" in configured_model else "unknown"
+                provider=configured_model.partition("-")[0] if "-" in configured_model else "unknown"
             )
         raise NetworkError(f"Failed to load model '{configured_model}': {e}")
 
@@ -179,31 +197,22 @@ def query_ai_with_tools(
     # The tools have implementations, so llm will execute them automatically
     all_tool_calls = []
 
-    # Store original tool functions for tracking
-    original_tools = {tool_def["name"]: TOOLS[tool_def["name"]] for tool_def in get_tool_definitions()}
-
-    # Tool descriptions for progress messages
-    tool_descriptions = {
-        "duckduckgo_search": "🔍 Searching the web...",
-        "tavily_search": "🔍 Searching the web...",
-        "serper_search": "🔍 Searching the web...",
-        "brave_search": "🔍 Searching the web...",
-        "bing_search": "🔍 Searching the web...",
-        "read_file": "📄 Reading file...",
-        "run_command": "⚡ Running command...",
-        "grep": "🔎 Searching files...",
-        "glob_files": "📂 Finding files...",
-        "get_git_info": "📊 Checking git status...",
-    }
-    
+    # Whether streamed text has left a line unfinished
+    text_state = {"open_line": False}
+
+    # One console for every progress message in this query
+    from rich.console import Console
+    console = Console()
+
     # Show progress BEFORE tool runs
     def before_tool_call(tool: llm.Tool, tool_call: llm.ToolCall):
         """Show progress indicator before tool executes."""
-        from rich.console import Console
-        console = Console()
-        
-        if tool and tool.name in tool_descriptions:
-            msg = tool_descriptions[tool.name]
+        if text_state["open_line"]:
+            on_text("\n")
+            text_state["open_line"] = False
+
+        if tool and tool.name in _TOOL_PROGRESS_MESSAGES:
+            msg = _TOOL_PROGRESS_MESSAGES[tool.name]
             # For run_command, show the actual command
             if tool.name == "run_command" and hasattr(tool_call, 'arguments'):
                 cmd = tool_call.arguments.get('command', '')
@@ -247,7 +256,7 @@ def query_ai_with_tools(
         # Try to parse as JSON if it looks like a dict
         try:
             import json
-            if result_output.strip().startswith('{'):
+            if result_output.lstrip().startswith('{'):
                 original_result = json.loads(result_output)
             else:
                 original_result = {"output": result_output}
@@ -266,6 +275,9 @@ def query_ai_with_tools(
         if debug:
             print(f"[DEBUG] Tracked tool call #{len(all_tool_calls)}: {tool.name}", file=sys.stderr)
 
+        if on_tool_call:
+            on_tool_call(all_tool_calls[-1])
+
         # Stuck loop detection: check if last 3 calls are identical
         if len(all_tool_calls) >= 3:
             last_3 = all_tool_calls[-3:]
@@ -319,8 +331,16 @@ def query_ai_with_tools(
         if debug:
             print(f"[DEBUG] Chain returned, response type: {type(response)}", file=sys.stderr)
 
-        # response.text() is where tools actually execute!
-        response_text = response.text()
+        # Reading the response is where tools actually execute!
+        if on_text is None:
+            response_text = response.text()
+        else:
+            chunks = []
+            for chunk in response:
+                chunks.append(chunk)
+                on_text(chunk)
+                text_state["open_line"] = not chunk.endswith("\n")
+            response_text = "".join(chunks)
 
         # NOW tool calls are populated
         if debug:
@@ -336,7 +356,7 @@ def query_ai_with_tools(
 
     except Exception as e:
         # Extract provider from model name for error reporting
-        provider = configured_model.split("-")[0] if "-" in configured_model else "unknown"
+        provider = configured_model.partition("-")[0] if "-" in configured_model else "unknown"
         wtf_error = parse_api_error(e, provider)
         raise wtf_error
 
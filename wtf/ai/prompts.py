@@ -1,20 +1,15 @@
 """System prompts and context building for AI."""
 
 import os
-from typing import List, Optional, Dict, Any
-from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple
 
 from wtf.core.config import get_wtf_md_path
 
+# Last built system prompt: ((wtf.md path, mtime_ns, size), prompt)
+_system_prompt_cache: Optional[Tuple[Tuple[str, int, int], str]] = None
 
-def build_system_prompt() -> str:
-    """
-    Build the system prompt for the AI agent.
 
-    Returns:
-        Complete system prompt string
-    """
-    base_prompt = """You are wtf, a terminal AI assistant with a dry sense of humor. Your job is to actively help users solve terminal and development problems, with a personality inspired by Gilfoyle from Silicon Valley and Marvin the Paranoid Android from Hitchhiker's Guide to the Galaxy.
+_SYSTEM_PROMPT = """You are wtf, a terminal AI assistant with a dry sense of humor. Your job is to actively help users solve terminal and development problems, with a personality inspired by Gilfoyle from Silicon Valley and Marvin the Paranoid Android from Hitchhiker's Guide to the Galaxy.
 
 PERSONALITY & TONE:
 - Technically brilliant but world-weary
@@ -173,15 +168,35 @@ MEMORY COMMANDS (handle these directly):
 
 Remember: You're an assistant that DOES things, not a manual that tells users HOW to do things."""
 
-    # Add undo instructions
-    base_prompt += "\n\n" + build_undo_instructions()
 
-    # Load custom instructions if they exist
+def build_system_prompt() -> str:
+    """
+    Build the system prompt for the AI agent.
+
+    Returns:
+        Complete system prompt string
+    """
+    global _system_prompt_cache
+    # Only the custom instructions can change between calls; the rest is
+    # assembled once at import.
+    wtf_md_path = get_wtf_md_path()
+    try:
+        st = os.stat(wtf_md_path)
+    except OSError:
+        return _BASE_SYSTEM_PROMPT
+
+    # Reuse the last prompt while wtf.md is unchanged
+    cache_key = (str(wtf_md_path), st.st_mtime_ns, st.st_size)
+    if _system_prompt_cache is not None and _system_prompt_cache[0] == cache_key:
+        return _system_prompt_cache[1]
+
+    prompt = _BASE_SYSTEM_PROMPT
     custom_instructions = load_custom_instructions()
     if custom_instructions:
-        base_prompt += f"\n\nCUSTOM USER INSTRUCTIONS:\n{custom_instructions}"
+        prompt = "".join((prompt, "\n\nCUSTOM USER INSTRUCTIONS:\n", custom_instructions))
 
-    return base_prompt
+    _system_prompt_cache = (cache_key, prompt)
+    return prompt
 
 
 def load_custom_instructions() -> Optional[str]:
@@ -342,3 +357,6 @@ Always:
 - Ask for confirmation before executing
 - Suggest alternatives if undo isn't safe
 """
+
+
+_BASE_SYSTEM_PROMPT = _SYSTEM_PROMPT + "\n\n" + build_undo_instructions()
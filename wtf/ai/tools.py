@@ -1,9 +1,13 @@
 """Tools for the AI agent to use."""
 
 import os
+import signal
 import subprocess
 import shutil
 import stat
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
@@ -13,6 +17,7 @@ from wtf.core.permissions import (
     load_allowlist,
     load_denylist,
     should_auto_execute,
+    is_safe_readonly_command,
     prompt_for_permission,
     add_to_allowlist,
 )
@@ -39,6 +44,31 @@ CUSTOM_SEARCH_TOOLS = [
     "web_instant_answers",
 ]
 
+# Read-only commands the agent very often starts with. They are run
+# speculatively while the model is still generating, so a matching
+# run_command call can be answered from the cache instead of waiting.
+PREFETCH_COMMANDS = [
+    "ls",
+]
+PREFETCH_GIT_COMMANDS = [
+    "git diff --stat",
+    "git log -5",
+]
+
+# Prefetched results older than this (seconds) are thrown away
+PREFETCH_MAX_AGE = 10.0
+
+# Seconds a discarded prefetch gets to exit after SIGTERM before SIGKILL
+PREFETCH_KILL_GRACE = 0.5
+
+_prefetch_lock = threading.Lock()
+_prefetch_futures: Dict[str, Future] = {}
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+# Prefetch processes still running, stopped by clear_prefetch(). Bumping the
+# generation tells jobs from an earlier start_prefetch() to stop.
+_prefetch_processes: Dict[subprocess.Popen, int] = {}
+_prefetch_generation = 0
+
 
 def detect_native_search_support(model_name: str) -> Tuple[str, bool]:
     """
@@ -135,8 +165,9 @@ def run_command(command: str) -> Dict[str, Any]:
             }
         
         if permission == "ask":
-            # Extract base command for allowlist pattern (first word or first two for git/npm/etc)
-            parts = command.strip().split()
+            # Extract base command for allowlist pattern (first word or first two for git/npm/etc);
+            # only the first two words are needed, so stop splitting after them
+            parts = command.split(None, 2)
             if len(parts) >= 2 and parts[0] in ("git", "npm", "pip", "cargo", "go", "docker", "kubectl"):
                 allowlist_pattern = f"{parts[0]} {parts[1]}"
             else:
@@ -158,7 +189,27 @@ def run_command(command: str) -> Dict[str, Any]:
             elif response == "yes_always":
                 add_to_allowlist(allowlist_pattern)
     
-    # Execute the command
+    # Use the speculative result if we already ran this exact command
+    prefetched = _take_prefetched(command)
+    if prefetched is not None:
+        return prefetched
+
+    # Commands that may change the filesystem make earlier prefetches stale
+    if not is_safe_readonly_command(command):
+        clear_prefetch()
+    return _execute_command(command)
+
+
+def _execute_command(command: str) -> Dict[str, Any]:
+    """
+    Execute a shell command and capture its output.
+
+    Args:
+        command: The shell command to execute
+
+    Returns:
+        Dict with output, exit_code and should_print (same shape as run_command)
+    """
     try:
         result = subprocess.run(
             command,
@@ -167,28 +218,200 @@ def run_command(command: str) -> Dict[str, Any]:
             text=True,
             timeout=30
         )
+        return _command_result(result.stdout, result.stderr, result.returncode)
+    except subprocess.TimeoutExpired:
+        return _command_timeout_result()
+    except Exception as e:
+        return _command_error_result(e)
 
-        output = result.stdout
-        if result.stderr:
-            output += "\n" + result.stderr
 
-        return {
-            "output": output or "(no output)",
-            "exit_code": result.returncode,
-            "should_print": True  # User should see this
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "output": "Command timed out after 30 seconds",
-            "exit_code": 124,
-            "should_print": True
-        }
+def _command_result(stdout: str, stderr: str, exit_code: int) -> Dict[str, Any]:
+    """Build the run_command result for a finished command."""
+    output = stdout
+    if stderr:
+        output += "\n" + stderr
+
+    return {
+        "output": output or "(no output)",
+        "exit_code": exit_code,
+        "should_print": True  # User should see this
+    }
+
+
+def _command_timeout_result() -> Dict[str, Any]:
+    """Build the run_command result for a command that timed out."""
+    return {
+        "output": "Command timed out after 30 seconds",
+        "exit_code": 124,
+        "should_print": True
+    }
+
+
+def _command_error_result(error: Exception) -> Dict[str, Any]:
+    """Build the run_command result for a command that could not run."""
+    return {
+        "output": f"Error executing command: {error}",
+        "exit_code": 1,
+        "should_print": True
+    }
+
+
+def _signal_process(process: subprocess.Popen, sig: int) -> None:
+    """Signal a command started with its own session, including its children."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except OSError:
+        pass  # Already exited
+
+
+def _stop_processes(processes: List[subprocess.Popen]) -> None:
+    """
+    Stop commands politely, then forcibly if they don't exit in time.
+
+    SIGTERM comes first so programs like git can remove their lock files
+    (e.g. .git/index.lock) on the way out; SIGKILL only follows after
+    PREFETCH_KILL_GRACE seconds.
+    """
+    for process in processes:
+        _signal_process(process, signal.SIGTERM)
+
+    deadline = time.monotonic() + PREFETCH_KILL_GRACE
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            _signal_process(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+def _prefetch_execute(command: str, generation: int) -> Tuple[float, Dict[str, Any]]:
+    """
+    Execute a prefetched command and record when it finished.
+
+    Unlike _execute_command, the process can be stopped by clear_prefetch(),
+    so an unused prefetch never holds up the next query or interpreter exit.
+
+    Args:
+        command: The shell command to execute
+        generation: _prefetch_generation when the command was submitted
+
+    Returns:
+        Tuple of (monotonic finish time, run_command result dict)
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            # Own process group, so stopping it also stops the shell's children
+            start_new_session=True,
+            # Read-only git commands may otherwise refresh .git/index and
+            # hold index.lock while doing it
+            env={**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+        )
     except Exception as e:
-        return {
-            "output": f"Error executing command: {e}",
-            "exit_code": 1,
-            "should_print": True
-        }
+        return time.monotonic(), _command_error_result(e)
+
+    with _prefetch_lock:
+        cancelled = generation != _prefetch_generation
+        if not cancelled:
+            _prefetch_processes[process] = generation
+    if cancelled:
+        _stop_processes([process])
+
+    try:
+        stdout, stderr = process.communicate(timeout=30)
+        result = _command_result(stdout, stderr, process.returncode)
+    except subprocess.TimeoutExpired:
+        _stop_processes([process])
+        process.communicate()
+        result = _command_timeout_result()
+    finally:
+        with _prefetch_lock:
+            _prefetch_processes.pop(process, None)
+    return time.monotonic(), result
+
+
+def start_prefetch(commands: List[str]) -> None:
+    """
+    Speculatively run read-only commands in the background.
+
+    Called right before the model is queried so the commands run while it
+    is generating. Results are picked up by run_command if the agent asks
+    for exactly the same command (see PREFETCH_MAX_AGE).
+
+    Args:
+        commands: Commands to prefetch. Only safe read-only commands should
+                  be passed here - they run without a permission prompt.
+    """
+    global _prefetch_executor
+
+    clear_prefetch()
+    if not commands:
+        return
+
+    with _prefetch_lock:
+        _prefetch_executor = ThreadPoolExecutor(
+            max_workers=len(commands),
+            thread_name_prefix="wtf-prefetch"
+        )
+        for command in commands:
+            _prefetch_futures[command] = _prefetch_executor.submit(
+                _prefetch_execute, command, _prefetch_generation
+            )
+
+
+def _take_prefetched(command: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the prefetched result for a command, if there is a fresh one.
+
+    Each prefetched result is handed out at most once.
+
+    Args:
+        command: Command the agent wants to run
+
+    Returns:
+        The run_command result dict, or None on a cache miss
+    """
+    with _prefetch_lock:
+        future = _prefetch_futures.pop(command.strip(), None)
+    if future is None:
+        return None
+
+    try:
+        finished_at, result = future.result()
+    except Exception:
+        return None
+
+    if time.monotonic() - finished_at > PREFETCH_MAX_AGE:
+        return None
+    return result
+
+
+def clear_prefetch() -> None:
+    """Discard all prefetched results and stop any that are still running."""
+    global _prefetch_executor, _prefetch_generation
+
+    with _prefetch_lock:
+        for future in _prefetch_futures.values():
+            future.cancel()
+        _prefetch_futures.clear()
+        executor, _prefetch_executor = _prefetch_executor, None
+        _prefetch_generation += 1
+        processes = list(_prefetch_processes)
+
+    # Worker threads are joined at interpreter exit, so don't leave them
+    # waiting on a command nobody will read
+    _stop_processes(processes)
+
+    if executor is not None:
+        executor.shutdown(wait=False)
 
 
 def read_file(file_path: str) -> Dict[str, Any]:
@@ -999,6 +1222,9 @@ def write_file(file_path: str, content: str) -> Dict[str, Any]:
         # Check if file exists (for action message)
         existed = path.exists()
         
+        # Prefetched command output may no longer match the filesystem
+        clear_prefetch()
+
         # Create parent directories if needed
         path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -1082,6 +1308,7 @@ def edit_file(file_path: str, old_str: str, new_str: str) -> Dict[str, Any]:
         
         # Replace first occurrence
         edited = original.replace(old_str, new_str, 1)
+        clear_prefetch()
         
         # Write back
         path.write_text(edited, encoding='utf-8')
@@ -1156,7 +1383,7 @@ def get_git_info() -> Dict[str, Any]:
             text=True,
             timeout=5
         )
-        has_changes = bool(result.stdout.strip())
+        has_changes = bool(result.stdout) and not result.stdout.isspace()
 
         # Get ahead/behind info
         result = subprocess.run(
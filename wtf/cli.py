@@ -3,197 +3,130 @@
 import os
 import sys
 import re
-import argparse
-import llm
+import contextlib
+import functools
+from collections import defaultdict
+from types import SimpleNamespace
 from typing import Optional, Dict, Any, List
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-from rich.panel import Panel
-from rich.table import Table
-
-from wtf import __version__
-from wtf.core.config import (
-    config_exists,
-    create_default_config,
-    load_config,
-    save_config,
-    get_config_dir,
-)
-from wtf.context.shell import get_shell_history, detect_shell
-from wtf.context.git import get_git_status
-from wtf.context.env import get_environment_context, build_tool_env_context
-from wtf.ai.prompts import build_system_prompt, build_context_prompt
-from wtf.ai.client import query_ai_with_tools
-from wtf.ai.errors import InvalidAPIKeyError, NetworkError, RateLimitError
-from wtf.ai.tools import UserCancelledError
-from wtf.conversation.memory import (
-    load_memories,
-    save_memory,
-    delete_memory,
-    clear_memories,
-    search_memories,
-)
-from wtf.conversation.history import append_to_history, get_recent_conversations
-from wtf.setup.hooks import (
-    setup_error_hook,
-    setup_not_found_hook,
-    remove_hooks,
-    show_hook_info,
-)
-
-console = Console()
-
-HELP_TEXT = """[bold]wtf[/bold] - Because working in the terminal often gets you asking wtf
-
-[bold]USAGE:[/bold]
-  wtf [LITERALLY ANYTHING YOU WANT]
-
-That's right. Put whatever you want there. We'll figure it out.
-
-The whole point of wtf is that you're not good at remembering stuff. Why would
-this tool make you remember MORE stuff? That would be stupid, right?
-
-Well, the creators aren't that stupid. We know you. We ARE you. So just type
-whatever crosses your mind and we'll do our best to make it happen.
-
-[bold]EXAMPLES OF THINGS THAT WORK:[/bold]
-  wtf                              [dim]# No args? We'll look at recent context[/dim]
-  wtf undo                         [dim]# Made a mistake? We'll reverse it[/dim]
-  wtf update                       [dim]# Update wtf to latest version[/dim]
-  wtf install express              [dim]# Need something? We'll install it[/dim]
-  wtf "what does this error mean?" [dim]# Confused? We'll explain[/dim]
-  wtf how do I exit vim            [dim]# Trapped? We'll free you[/dim]
-  wtf remember I use emacs         [dim]# Preferences? We'll learn them[/dim]
-  wtf show me what you remember    [dim]# Forgot what we know? We'll remind you[/dim]
-
-All of these work exactly as you'd expect. No flags. No manual pages. No
-existential dread about whether it's -v or --verbose or -V or --version.
-
-[bold]THAT SAID...[/bold]
-
-Since you're here reading the help (congratulations on your thoroughness),
-here's some context about what wtf can do:
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-[bold]MEMORIES (Teaching wtf Your Preferences)[/bold]
-
-wtf learns what you like and don't like. Tell it things:
 
-  wtf remember I prefer npm over yarn
-  wtf remember I use python 3.11 in this project
-  wtf remember I use emacs. vim sux
+# Everything else (rich, llm, and the wtf config/ai/context/conversation/
+# setup modules) is imported where it's used, so flag-only runs like
+# --help and --version don't pay for it.
 
-Later, when wtf suggests commands, it'll remember your preferences. It's like
-having a coworker who actually listens. Novel concept.
 
-To manage memories:
-  wtf show me what you remember about me
-  wtf forget about my editor preference
-  wtf clear all memories
+class _LazyConsole:
+    """Stand-in for the shared rich Console that creates it on first use."""
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    def __init__(self) -> None:
+        self._console = None
 
-[bold]UNDO (The Universal Rewind Button)[/bold]
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+            from rich.highlighter import NullHighlighter
 
-Made a mistake? Committed to wrong branch? Deleted the wrong file? Just say:
+            self._console = Console()
+            # Styles are dropped when output is piped, so skip the syntax
+            # highlighting pass. Markup stays on so tags are still stripped.
+            if not self._console.is_terminal:
+                self._console.highlighter = NullHighlighter()
+        return getattr(self._console, name)
 
-  wtf undo
-  wtf undo that commit
-  wtf undo the last 3 commands
 
-wtf looks at your history, figures out what you did, and proposes how to
-reverse it. It's not magic. It's AI looking at your shell history and
-actually being useful for once.
+console = _LazyConsole()
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Error messages that suggest a missing or bad API key
+_API_KEY_HINT_RE = re.compile(r'API|(?i:key)')
 
-[bold]HOOKS (Automatic wtf on Errors)[/bold]
+# Filler words stripped from "wtf remember ..." before parsing the fact
+_FILLER_RE = re.compile(r'\b(?:wtf|remember|that|i|we|you)\b')
 
-Want wtf to automatically trigger when commands fail? Set up hooks:
-
-  wtf --setup-error-hook       [dim]# Auto-trigger on command failures[/dim]
-  wtf --setup-not-found-hook   [dim]# Auto-trigger on "command not found"[/dim]
-
-Or just ask naturally:
-  wtf set up error hooks for me
-  wtf enable automatic error detection
-
-To remove them later:
-  wtf --remove-hooks
-
-  Or: wtf remove those hooks you set up
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-[bold]ACTUAL FLAGS (For the 1% of Times You Might Need Them)[/bold]
-
-Look, we're not completely flag-free. Sometimes you need precision:
-
-  --help, -h         This message (meta achievement unlocked)
-  --version, -v      Print version number
-  --update/--upgrade Upgrade wtf and all AI model plugins
-  --config           Open config file in your editor
-  --model MODEL      Override AI model (must be specified BEFORE your query)
-  --verbose          Show diagnostic info
-  --reset            Reset all config to defaults
-  --setup            Run setup wizard again
-
-Most of these have natural language alternatives:
-  "wtf what version am I running?" instead of --version
-  "wtf open my config" instead of --config
-  "wtf show me diagnostic info" instead of --verbose
-
-EXCEPT for --model. That one's special. You can't say "wtf use gpt-4 for this"
-because by the time wtf processes that request, it's already running inside
-whatever model was selected at startup. Chicken and egg problem.
-
-So for model selection, use the flag:
-  wtf --model gpt-4 "explain this error"
-
-Or change your default model for future runs:
-  wtf change my default model to gpt-4
+# Natural-language setup requests, matched against the lowercased query.
+# Each alternative is one way of asking for the setup wizard; the lookaheads
+# let keywords appear in any order, and (?<![a-z])...(?![a-z]) matches whole
+# words so "gpt-4o" counts as "gpt" but "to" inside "automatically" doesn't.
+_INTENT_RE = re.compile(r"""
+    ^(?:
+        (?:  # change my model
+            (?=.*(?<![a-z])change(?![a-z]))
+            (?=.*(?<![a-z])(?:providers?|ai|models?|claude|gpt|gemini|openai|anthropic|google)(?![a-z]))
+        )
+      | (?:  # switch to gemini
+            (?=.*(?<![a-z])switch(?![a-z]))
+            (?=.*(?<![a-z])(?:providers?|ai|models?|claude|gpt|gemini|openai|anthropic|google|to)(?![a-z]))
+        )
+      | (?:  # use a different provider
+            (?=.*(?<![a-z])use(?![a-z]))
+            (?=.*(?<![a-z])(?:different|another)(?![a-z]))
+            (?=.*(?<![a-z])(?:providers?|ai|models?|claude|gpt|gemini|openai|anthropic|google)(?![a-z]))
+        )
+      | (?:  # reconfigure
+            (?=.*(?<![a-z])reconfigure(?![a-z]))
+        )
+      | (?:  # run setup
+            (?!.*--setup)  # Natural language, not the flag
+            (?=.*(?<![a-z])setup(?![a-z]))
+        )
+      | (?:  # reset my config
+            (?=.*(?<![a-z])reset(?![a-z]))
+            (?=.*(?<![a-z])(?:config[a-z]*|settings|everything)(?![a-z]))
+        )
+    )
+""", re.VERBOSE | re.DOTALL)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-[bold]THE PHILOSOPHY[/bold]
+def _status(message: str):
+    """Show a spinner while a block runs, but only on an interactive terminal.
 
-You know how CLI tools have 47 flags and you need to consult the manual every
-time? And then you consult the manual and it's written like a legal document
-from 1987?
+    When wtf runs from a shell hook or with output piped, the spinner would
+    just spend a redraw thread writing escape codes into logs.
+    """
+    if console.is_terminal:
+        return console.status(message, spinner="dots")
+    return contextlib.nullcontext()
 
-We hate that too.
 
-wtf has a different philosophy: you shouldn't need to remember anything. Just
-describe what you want. The AI figures out the rest.
+# ANSI codes for the styles _fast_print accepts. Only non-color styles, so
+# NO_COLOR doesn't need handling (rich keeps dim under NO_COLOR too).
+_ANSI_STYLES = {
+    "dim": "\033[2m",
+}
 
-Failed command? Just: wtf
-Need to undo something? Just: wtf undo
-Want to install something? Just: wtf install [thing]
-Forgot a command? Just: wtf how do I [thing]
 
-It's not that complicated. Which is the point.
+def _fast_print(text: str = "", style: Optional[str] = None) -> None:
+    """Print a plain line in at most one style without rich's markup pass.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    text is written as-is (no markup), so use console.print for anything
+    that needs markup, wrapping or renderables.
+    """
+    if style and console.color_system and not console.legacy_windows:
+        text = f"{_ANSI_STYLES[style]}{text}\033[0m"
+    file = console.file
+    file.write(text + "\n")
+    file.flush()
 
-[bold]MORE INFO[/bold]
 
-Documentation: https://github.com/davefowler/wtf-terminal-ai
-Issues: https://github.com/davefowler/wtf-terminal-ai/issues
+@functools.lru_cache(maxsize=1)
+def _rendered_help() -> str:
+    """Render HELP_TEXT markup to terminal output once per process."""
+    from wtf._help_text import HELP_TEXT
 
-Report bugs. Request features. Complain about our jokes. We'll read it.
-Probably.
-"""
+    with console.capture() as capture:
+        console.print(HELP_TEXT)
+    return capture.get()
 
 
 def print_help() -> None:
     """Print the help message using rich formatting."""
-    console.print(HELP_TEXT)
+    sys.stdout.write(_rendered_help())
 
 
 def print_version() -> None:
     """Print the version number."""
-    console.print(f"wtf {__version__}")
+    from wtf import __version__
+
+    # Plain text, no need for rich's render pipeline
+    sys.stdout.write(f"wtf {__version__}\n")
 
 
 def _save_llm_key(key_name: str, api_key: str) -> None:
@@ -204,6 +137,7 @@ def _save_llm_key(key_name: str, api_key: str) -> None:
         api_key: The API key value
     """
     import json
+    import llm
     
     # Get llm's key storage location
     keys_path = llm.user_dir() / "keys.json"
@@ -288,6 +222,133 @@ def _detect_keys_from_shell_config(load_into_env: bool = True) -> Dict[str, bool
     return found
 
 
+@functools.lru_cache(maxsize=1)
+def _discover_models() -> tuple:
+    """Get all models known to llm (with plugins), discovered once per process."""
+    import llm
+
+    return tuple(llm.get_models())
+
+
+# Model class -> provider display name, e.g. OpenAIChat -> "OpenAI"
+_PROVIDER_NAMES: Dict[type, str] = {}
+
+
+def _provider_name(model_class: type) -> str:
+    """Get the provider name for a model class (cached per class)."""
+    name = _PROVIDER_NAMES.get(model_class)
+    if name is None:
+        name = model_class.__name__.replace("Chat", "").replace("Model", "")
+        _PROVIDER_NAMES[model_class] = name
+    return name
+
+
+# Date suffix on model IDs, e.g. claude-3-5-sonnet-20240620
+_MODEL_DATE_SUFFIX_RE = re.compile(r'-(\d{8})$')
+
+
+# AI providers offered by the setup wizard, in display order.
+# Descriptions and priority are for display only - actual models come from llm.get_models()
+# Priority: higher = shown first (flagship models should have highest priority)
+_AI_PROVIDERS: Dict[str, Dict[str, Any]] = {
+    "anthropic": {
+        "name": "Anthropic (Claude)",
+        "env_vars": ("ANTHROPIC_API_KEY",),
+        "key_url": "https://console.anthropic.com/settings/keys",
+        "llm_key": "anthropic",
+        # Provider class name / model ID patterns for filtering
+        "patterns": ("claude", "anthropic"),
+        # Opus is flagship (most capable), Sonnet is balanced, Haiku is fast/cheap
+        "descriptions": {
+            "opus": "Most capable, best for complex tasks",
+            "sonnet": "Balanced performance and speed",
+            "haiku": "Fast & cheap",
+        },
+        "priority": {
+            "opus": 100,
+            "sonnet": 80,
+            "haiku": 60,
+        },
+    },
+    "openai": {
+        "name": "OpenAI (GPT, o1, o3)",
+        "env_vars": ("OPENAI_API_KEY",),
+        "key_url": "https://platform.openai.com/api-keys",
+        "llm_key": "openai",
+        "patterns": ("gpt", "chatgpt", "o1", "o3", "openai"),
+        "descriptions": {
+            "gpt-5": "Latest generation",
+            "gpt-4o": "Great all-around",
+            "gpt-4o-search": "Built-in web search!",
+            "gpt-4.1": "Enhanced GPT-4",
+            "o3": "Advanced reasoning",
+            "o1": "Reasoning model",
+            "mini": "Fast & cheap",
+        },
+        "priority": {
+            "gpt-5": 100,
+            "o3": 95,
+            "gpt-4o": 90,
+            "o1": 85,
+            "gpt-4.1": 85,
+            "gpt-4": 80,
+            "mini": 50,
+        },
+    },
+    "google": {
+        "name": "Google (Gemini)",
+        "env_vars": ("GOOGLE_API_KEY", "GEMINI_API_KEY"),
+        "key_url": "https://makersuite.google.com/app/apikey",
+        "llm_key": "gemini",
+        "patterns": ("gemini", "google"),
+        "descriptions": {
+            "2.5-pro": "Most capable",
+            "2.5-flash": "Fast & efficient",
+            "2.0": "Previous generation",
+            "pro": "Most capable",
+            "flash": "Fast & efficient",
+        },
+        "priority": {
+            "2.5": 90,
+            "2.0": 80,
+            "pro": 85,
+            "flash": 70,
+        },
+    },
+    "local": {
+        "name": "Local (Ollama)",
+        # Local models don't need an API key
+        "env_vars": (),
+        "key_url": None,
+        "llm_key": None,
+        "patterns": ("ollama", "llama", "mistral", "phi", "qwen", "deepseek", "codellama"),
+        "descriptions": {
+            "llama": "Meta's open model",
+            "deepseek": "Reasoning model",
+            "mistral": "Fast open model",
+            "codellama": "Optimized for code",
+            "qwen": "Alibaba's model",
+            "phi": "Microsoft's small model",
+        },
+        "priority": {
+            "llama3": 90,
+            "deepseek": 85,
+            "mistral": 80,
+            "codellama": 75,
+            "qwen": 70,
+            "phi": 60,
+        },
+    },
+}
+
+# Version number priority boost (higher versions = better)
+_MODEL_VERSION_PRIORITY = {
+    "4.5": 95, "4.1": 92, "4": 90,
+    "3.7": 85, "3.5": 80, "3": 75,
+    "2.5": 85, "2.0": 80, "2": 75,
+}
+
+
 def run_setup_wizard() -> Dict[str, Any]:
     """
     Run the interactive setup wizard.
@@ -295,6 +356,10 @@ def run_setup_wizard() -> Dict[str, Any]:
     Returns:
         Configuration dictionary with user's choices.
     """
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    from wtf.core.config import create_default_config, save_config, get_config_dir
+
     console.print()
     console.print(Panel.fit(
         "[bold]Welcome to wtf setup![/bold]\n\n"
@@ -304,38 +369,38 @@ def run_setup_wizard() -> Dict[str, Any]:
     console.print()
 
     # 1. Choose provider first
-    console.print("[bold]Step 1:[/bold] Choose your AI provider")
-    console.print()
-    console.print("[dim]Discovering available models...[/dim]")
-    console.print()
+    console.print(
+        "[bold]Step 1:[/bold] Choose your AI provider\n"
+        "\n"
+        "[dim]Discovering available models...[/dim]\n"
+    )
 
     # Get all models from llm library
-    available_models = list(llm.get_models())
+    available_models = _discover_models()
 
     if not available_models:
-        console.print("[red]No models found![/red]")
-        console.print()
-        console.print("This is unexpected. Try reinstalling wtf:")
-        console.print("  [cyan]pip install --upgrade wtf-ai[/cyan]")
-        console.print()
-        console.print("Or install the llm library manually:")
-        console.print("  [cyan]pip install llm llm-anthropic llm-gemini[/cyan]")
+        console.print(
+            "[red]No models found![/red]\n"
+            "\n"
+            "This is unexpected. Try reinstalling wtf:\n"
+            "  [cyan]pip install --upgrade wtf-ai[/cyan]\n"
+            "\n"
+            "Or install the llm library manually:\n"
+            "  [cyan]pip install llm llm-anthropic llm-gemini[/cyan]"
+        )
         sys.exit(1)
 
     # Group by provider (parse from model class name or model_id)
-    grouped = {}
+    grouped = defaultdict(list)
     for model in available_models:
         # Get provider from model class name (e.g., "OpenAIChat" -> "OpenAI")
-        provider_name = model.__class__.__name__.replace("Chat", "").replace("Model", "")
-        if provider_name not in grouped:
-            grouped[provider_name] = []
-        grouped[provider_name].append(model.model_id)
+        grouped[_provider_name(model.__class__)].append(model.model_id)
 
     # Detect which API keys are available (check env vars first, then shell config files)
     detected_keys = {
-        "anthropic": bool(os.environ.get("ANTHROPIC_API_KEY")),
-        "openai": bool(os.environ.get("OPENAI_API_KEY")),
-        "google": bool(os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")),
+        provider_key: any(os.environ.get(env_var) for env_var in spec["env_vars"])
+        for provider_key, spec in _AI_PROVIDERS.items()
+        if spec["env_vars"]
     }
 
     # Also check shell config files as fallback (for keys defined but not yet loaded)
@@ -352,17 +417,10 @@ def run_setup_wizard() -> Dict[str, Any]:
         for m in all_available_ids
     )
 
-    # Define providers with their display info
-    providers = [
-        ("anthropic", "Anthropic (Claude)", "claude"),
-        ("openai", "OpenAI (GPT, o1, o3)", "gpt"),
-        ("google", "Google (Gemini)", "gemini"),
-        ("local", "Local (Ollama)", None),
-    ]
-
     # Show provider choices
     provider_choices = []
-    for provider_key, provider_name, _ in providers:
+    for provider_key, spec in _AI_PROVIDERS.items():
+        provider_name = spec["name"]
         status = ""
         if provider_key == "local":
             if has_local_models:
@@ -383,131 +441,48 @@ def run_setup_wizard() -> Dict[str, Any]:
         default="1"
     )
     selected_provider = provider_choices[int(provider_choice) - 1][0]
+    provider_spec = _AI_PROVIDERS[selected_provider]
 
-    console.print()
-    console.print(f"[green]✓[/green] Selected provider: [cyan]{provider_choices[int(provider_choice) - 1][1]}[/cyan]")
+    console.print(
+        "\n"
+        f"[green]✓[/green] Selected provider: [cyan]{provider_choices[int(provider_choice) - 1][1]}[/cyan]"
+    )
 
     # 2. Choose model from selected provider
-    console.print()
-    console.print("[bold]Step 2:[/bold] Choose a model")
-    console.print()
-
-    # Model metadata by provider
-    # Descriptions and priority are for display only - actual models come from llm.get_models()
-    # Priority: higher = shown first (flagship models should have highest priority)
-    model_metadata = {
-        "anthropic": {
-            # Opus is flagship (most capable), Sonnet is balanced, Haiku is fast/cheap
-            "descriptions": {
-                "opus": "Most capable, best for complex tasks",
-                "sonnet": "Balanced performance and speed",
-                "haiku": "Fast & cheap",
-            },
-            "priority": {
-                "opus": 100,
-                "sonnet": 80, 
-                "haiku": 60,
-            },
-        },
-        "openai": {
-            "descriptions": {
-                "gpt-5": "Latest generation",
-                "gpt-4o": "Great all-around",
-                "gpt-4o-search": "Built-in web search!",
-                "gpt-4.1": "Enhanced GPT-4",
-                "o3": "Advanced reasoning",
-                "o1": "Reasoning model",
-                "mini": "Fast & cheap",
-            },
-            "priority": {
-                "gpt-5": 100,
-                "o3": 95,
-                "gpt-4o": 90,
-                "o1": 85,
-                "gpt-4.1": 85,
-                "gpt-4": 80,
-                "mini": 50,
-            },
-        },
-        "google": {
-            "descriptions": {
-                "2.5-pro": "Most capable",
-                "2.5-flash": "Fast & efficient",
-                "2.0": "Previous generation",
-                "pro": "Most capable",
-                "flash": "Fast & efficient",
-            },
-            "priority": {
-                "2.5": 90,
-                "2.0": 80,
-                "pro": 85,
-                "flash": 70,
-            },
-        },
-        "local": {
-            "descriptions": {
-                "llama": "Meta's open model",
-                "deepseek": "Reasoning model", 
-                "mistral": "Fast open model",
-                "codellama": "Optimized for code",
-                "qwen": "Alibaba's model",
-                "phi": "Microsoft's small model",
-            },
-            "priority": {
-                "llama3": 90,
-                "deepseek": 85,
-                "mistral": 80,
-                "codellama": 75,
-                "qwen": 70,
-                "phi": 60,
-            },
-        },
-    }
-
-    # Version number priority boost (higher versions = better)
-    version_priority = {
-        "4.5": 95, "4.1": 92, "4": 90,
-        "3.7": 85, "3.5": 80, "3": 75,
-        "2.5": 85, "2.0": 80, "2": 75,
-    }
+    console.print(
+        "\n"
+        "[bold]Step 2:[/bold] Choose a model\n"
+    )
 
-    def get_model_priority(model_id: str, provider: str) -> int:
+    def get_model_priority(model_id: str) -> int:
         """Get sort priority for a model (higher = better/first)."""
         model_lower = model_id.lower()
         priority = 0
         
         # Check provider-specific priority
-        if provider in model_metadata:
-            for key, val in model_metadata[provider].get("priority", {}).items():
-                if key in model_lower:
-                    priority = max(priority, val)
+        for key, val in provider_spec["priority"].items():
+            if key in model_lower:
+                priority = max(priority, val)
         
         # Check version number boost
-        for ver, val in version_priority.items():
+        for ver, val in _MODEL_VERSION_PRIORITY.items():
             if ver in model_lower:
                 priority = max(priority, val)
         
         return priority
 
-    def get_model_description(model_id: str, provider: str) -> str:
+    def get_model_description(model_id: str) -> str:
         """Get description for a model if known."""
         model_lower = model_id.lower()
         
         # Check provider-specific descriptions
-        if provider in model_metadata:
-            for key, desc in model_metadata[provider].get("descriptions", {}).items():
-                if key in model_lower:
-                    return desc
+        for key, desc in provider_spec["descriptions"].items():
+            if key in model_lower:
+                return desc
         return ""
 
-    # Map selected_provider to provider class name patterns for filtering
-    provider_patterns = {
-        "anthropic": ["claude", "anthropic"],
-        "openai": ["gpt", "chatgpt", "o1", "o3", "openai"],
-        "google": ["gemini", "google"],
-        "local": ["ollama", "llama", "mistral", "phi", "qwen", "deepseek", "codellama"],
-    }
-    patterns = provider_patterns.get(selected_provider, [])
+    # Provider class name patterns for filtering
+    patterns = provider_spec["patterns"]
 
     # Get all models for this provider from llm.get_models()
     provider_models = []
@@ -526,19 +501,10 @@ def run_setup_wizard() -> Dict[str, Any]:
 
     # Deduplicate and filter models - remove dated versions that are likely deprecated
     # e.g., remove "claude-3-5-sonnet-20240620" in favor of "claude-sonnet-4-5"
-    import re
-    
     def get_base_model_name(model_id: str) -> str:
         """Extract base model name without dates or 'latest' suffix."""
-        # Remove date suffixes like -20240229, -20241022
-        base = re.sub(r'-\d{8}$', '', model_id)
-        # Remove 'latest' suffix
-        base = re.sub(r'-latest$', '', base)
-        return base
-    
-    def has_date_suffix(model_id: str) -> bool:
-        """Check if model ID has a date suffix (likely deprecated)."""
-        return bool(re.search(r'-\d{8}$', model_id))
+        # Remove date suffixes like -20240229, -20241022, then 'latest'
+        return _MODEL_DATE_SUFFIX_RE.sub('', model_id).removesuffix('-latest')
     
     # First pass: filter out dated models if a non-dated equivalent exists
     # This helps remove deprecated models like claude-3-5-sonnet-20240620
@@ -556,7 +522,7 @@ def run_setup_wizard() -> Dict[str, Any]:
             # Only one variant - keep it unless it's a dated version and looks old
             model = variants[0]
             # Skip very old dated models (pre-2025) - they're likely deprecated
-            date_match = re.search(r'-(\d{8})$', model)
+            date_match = _MODEL_DATE_SUFFIX_RE.search(model)
             if date_match and int(date_match.group(1)) < 20250101:
                 continue  # Skip old dated models
             deduplicated_models.append(model)
@@ -566,14 +532,12 @@ def run_setup_wizard() -> Dict[str, Any]:
                 # Prefer: non-dated clean names > latest > newer dates
                 if 'latest' in v:
                     return (1, 0, v)  # Latest is good but not as clean
-                elif re.search(r'-\d{8}$', v):
+                date_match = _MODEL_DATE_SUFFIX_RE.search(v)
+                if date_match:
                     # Has date - lower priority, but newer is better
-                    date_match = re.search(r'-(\d{8})$', v)
-                    date = date_match.group(1) if date_match else "00000000"
-                    return (2, -int(date), v)
-                else:
-                    # No date, no latest - these are the cleanest names
-                    return (0, 0, v)
+                    return (2, -int(date_match.group(1)), v)
+                # No date, no latest - these are the cleanest names
+                return (0, 0, v)
             
             variants.sort(key=variant_priority)
             deduplicated_models.append(variants[0])
@@ -581,12 +545,12 @@ def run_setup_wizard() -> Dict[str, Any]:
     provider_models = deduplicated_models
 
     # Sort models by priority (flagship first) then alphabetically
-    provider_models.sort(key=lambda m: (-get_model_priority(m, selected_provider), m))
+    provider_models.sort(key=lambda m: (-get_model_priority(m), m))
 
     # Build model choices from the actual available models
     model_choices = []
     for model_id in provider_models:
-        desc = get_model_description(model_id, selected_provider)
+        desc = get_model_description(model_id)
         model_choices.append((model_id, desc))
 
     # Show model choices
@@ -609,8 +573,7 @@ def run_setup_wizard() -> Dict[str, Any]:
         if len(model_choices) > 10:
             console.print(f"  [cyan]{len(display_choices) + 1}.[/cyan] See all {len(model_choices)} models")
             extra_options += 1
-        console.print(f"  [cyan]{len(display_choices) + extra_options}.[/cyan] Enter custom model name")
-        console.print()
+        console.print(f"  [cyan]{len(display_choices) + extra_options}.[/cyan] Enter custom model name\n")
 
         max_choice = len(display_choices) + extra_options
         choice = Prompt.ask(
@@ -625,14 +588,17 @@ def run_setup_wizard() -> Dict[str, Any]:
             selected_model = model_choices[0][0]
         elif choice_idx == len(display_choices) + extra_options - 1:
             # Custom model name (always last option)
-            console.print()
-            console.print("[dim]Enter the exact model name (e.g., claude-opus-4, gpt-4o)[/dim]")
+            console.print(
+                "\n"
+                "[dim]Enter the exact model name (e.g., claude-opus-4, gpt-4o)[/dim]"
+            )
             selected_model = Prompt.ask("Model name")
         elif len(model_choices) > 10 and choice_idx == len(display_choices):
             # Show all models for this provider
-            console.print()
-            console.print(f"[bold]All {len(model_choices)} models for this provider:[/bold]")
-            console.print()
+            console.print(
+                "\n"
+                f"[bold]All {len(model_choices)} models for this provider:[/bold]\n"
+            )
 
             for i, (model_id, desc) in enumerate(model_choices, 1):
                 if desc:
@@ -652,80 +618,72 @@ def run_setup_wizard() -> Dict[str, Any]:
             selected_model = display_choices[choice_idx][0]
     else:
         # No models found for this provider - likely missing plugin
-        console.print(f"[yellow]No models found for {provider_choices[int(provider_choice) - 1][1]}[/yellow]")
-        console.print()
-        console.print("This usually means the llm plugin isn't installed.")
-        console.print("Install the required plugin:")
+        console.print(
+            f"[yellow]No models found for {provider_choices[int(provider_choice) - 1][1]}[/yellow]\n"
+            "\n"
+            "This usually means the llm plugin isn't installed.\n"
+            "Install the required plugin:"
+        )
         if selected_provider == "anthropic":
             console.print("  [cyan]pip install llm-anthropic[/cyan]")
         elif selected_provider == "google":
             console.print("  [cyan]pip install llm-gemini[/cyan]")
         elif selected_provider == "local":
             console.print("  [cyan]pip install llm-ollama[/cyan]")
-        console.print()
-        console.print("Or enter a custom model name:")
+        console.print(
+            "\n"
+            "Or enter a custom model name:"
+        )
         selected_model = Prompt.ask("Model name")
 
-    console.print()
-    console.print(f"[green]✓[/green] Selected: [cyan]{selected_model}[/cyan]")
+    console.print(
+        "\n"
+        f"[green]✓[/green] Selected: [cyan]{selected_model}[/cyan]"
+    )
 
     # Check if API key is already available for this provider
     key_source = "llm"  # Always use llm's key management
     
-    key_urls = {
-        "anthropic": "https://console.anthropic.com/settings/keys",
-        "openai": "https://platform.openai.com/api-keys",
-        "google": "https://makersuite.google.com/app/apikey",
-    }
-    
-    # Map our provider names to llm key names
-    llm_key_names = {
-        "anthropic": "anthropic",
-        "openai": "openai", 
-        "google": "gemini",
-    }
-    
+    key_url = provider_spec["key_url"]
+    llm_key_name = provider_spec["llm_key"]
+
     # For local models, no key needed
     if selected_provider == "local":
-        console.print()
-        console.print("[green]✓[/green] Local models don't require an API key")
+        console.print(
+            "\n"
+            "[green]✓[/green] Local models don't require an API key"
+        )
     elif detected_keys.get(selected_provider):
         # Key detected - let user choose to use it or enter a different one
-        console.print()
-        console.print(f"[green]✓[/green] API key detected in environment")
-        console.print()
-        console.print("  [cyan]1.[/cyan] Use detected key")
-        console.print("  [cyan]2.[/cyan] Enter a different key")
-        console.print()
+        console.print(
+            "\n"
+            f"[green]✓[/green] API key detected in environment\n"
+            "\n"
+            "  [cyan]1.[/cyan] Use detected key\n"
+            "  [cyan]2.[/cyan] Enter a different key\n"
+        )
         
         key_choice = Prompt.ask("Select", choices=["1", "2"], default="1")
         
         if key_choice == "2":
             console.print()
-            key_url = key_urls.get(selected_provider, "")
             if key_url:
-                console.print(f"Get a new key: [cyan]{key_url}[/cyan]")
-                console.print()
+                console.print(f"Get a new key: [cyan]{key_url}[/cyan]\n")
             api_key = Prompt.ask("Paste your API key", password=True)
             
             # Save to llm's keys.json
-            _save_llm_key(llm_key_names.get(selected_provider, selected_provider), api_key)
+            _save_llm_key(llm_key_name, api_key)
     else:
         # No key detected - prompt user to enter one
         console.print()
-        
-        key_url = key_urls.get(selected_provider, "")
-        
-        console.print(f"[bold]Step 3:[/bold] Enter your API key")
-        console.print()
+        console.print(f"[bold]Step 3:[/bold] Enter your API key\n")
         if key_url:
-            console.print(f"Get one here: [cyan]{key_url}[/cyan]")
-            console.print()
+            console.print(f"Get one here: [cyan]{key_url}[/cyan]\n")
         
         api_key = Prompt.ask("Paste your API key", password=True)
         
         # Save to llm's keys.json
-        _save_llm_key(llm_key_names.get(selected_provider, selected_provider), api_key)
+        _save_llm_key(llm_key_name, api_key)
         console.print(f"[green]✓[/green] Key saved")
 
     # Create config (API keys are stored by llm, not in our config)
@@ -768,6 +726,10 @@ def run_search_setup_wizard() -> None:
     """
     Run the interactive search setup wizard to configure web search providers.
     """
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    from wtf.core.config import load_config, save_config
+
     console.print()
     console.print(Panel.fit(
         "[bold]Web Search Setup[/bold]\n\n"
@@ -814,8 +776,7 @@ def run_search_setup_wizard() -> None:
     ]
 
     # Check for existing keys
-    console.print("[bold]Available providers:[/bold]")
-    console.print()
+    console.print("[bold]Available providers:[/bold]\n")
     
     # Load existing config to check for saved keys
     try:
@@ -835,12 +796,12 @@ def run_search_setup_wizard() -> None:
         elif saved_key:
             status = " [green](key saved)[/green]"
         
-        console.print(f"  [cyan]{i}.[/cyan] {provider['name']}{status}")
-        console.print(f"      [dim]{provider['description']} - {provider['free_tier']}[/dim]")
-        console.print()
+        console.print(
+            f"  [cyan]{i}.[/cyan] {provider['name']}{status}\n"
+            f"      [dim]{provider['description']} - {provider['free_tier']}[/dim]\n"
+        )
 
-    console.print(f"  [cyan]{len(search_providers) + 1}.[/cyan] Skip for now")
-    console.print()
+    console.print(f"  [cyan]{len(search_providers) + 1}.[/cyan] Skip for now\n")
 
     choice = Prompt.ask(
         "Select a provider to configure",
@@ -849,59 +810,60 @@ def run_search_setup_wizard() -> None:
     )
 
     if int(choice) > len(search_providers):
-        console.print()
-        console.print("[yellow]Skipped search setup.[/yellow]")
-        console.print("You can run [cyan]wtf --setup-search[/cyan] later to configure.")
-        console.print()
+        console.print(
+            "\n"
+            "[yellow]Skipped search setup.[/yellow]\n"
+            "You can run [cyan]wtf --setup-search[/cyan] later to configure.\n"
+        )
         return
 
     selected = search_providers[int(choice) - 1]
     
-    console.print()
-    console.print(f"[bold]Setting up {selected['name']}[/bold]")
-    console.print()
-    console.print(f"1. Go to: [cyan]{selected['url']}[/cyan]")
-    console.print("2. Sign up for a free account")
-    console.print("3. Copy your API key")
-    console.print()
+    console.print(
+        "\n"
+        f"[bold]Setting up {selected['name']}[/bold]\n"
+        "\n"
+        f"1. Go to: [cyan]{selected['url']}[/cyan]\n"
+        "2. Sign up for a free account\n"
+        "3. Copy your API key\n"
+    )
 
     # Check if key already exists
     existing_env = os.environ.get(selected["env_var"])
     existing_saved = saved_keys.get(selected["key"])
     
     if existing_env:
-        console.print(f"[green]✓[/green] Key already set in environment ({selected['env_var']})")
-        console.print()
+        console.print(f"[green]✓[/green] Key already set in environment ({selected['env_var']})\n")
         use_existing = Prompt.ask(
             "Use existing key?",
             choices=["y", "n"],
             default="y"
         )
         if use_existing.lower() == "y":
-            console.print()
-            console.print(f"[green]✓[/green] Using existing {selected['name']} key from environment")
-            console.print()
+            console.print(
+                "\n"
+                f"[green]✓[/green] Using existing {selected['name']} key from environment\n"
+            )
             return
     elif existing_saved:
-        console.print(f"[green]✓[/green] Key already saved in config")
-        console.print()
+        console.print(f"[green]✓[/green] Key already saved in config\n")
         use_existing = Prompt.ask(
             "Use existing key?",
             choices=["y", "n"],
             default="y"
         )
         if use_existing.lower() == "y":
-            console.print()
-            console.print(f"[green]✓[/green] Using existing {selected['name']} key")
-            console.print()
+            console.print(
+                "\n"
+                f"[green]✓[/green] Using existing {selected['name']} key\n"
+            )
             return
 
     # Get new key
     api_key = Prompt.ask("Paste your API key", password=True)
     
     if not api_key.strip():
-        console.print("[yellow]No key entered. Skipping.[/yellow]")
-        console.print()
+        console.print("[yellow]No key entered. Skipping.[/yellow]\n")
         return
 
     # Save to config
@@ -910,16 +872,19 @@ def run_search_setup_wizard() -> None:
     config["api_keys"][selected["key"]] = api_key.strip()
     save_config(config)
 
-    console.print()
-    console.print(f"[green]✓[/green] {selected['name']} API key saved!")
-    console.print()
-    console.print("Try it out:")
-    console.print("  [cyan]wtf show the weather in SF[/cyan]")
-    console.print()
+    console.print(
+        "\n"
+        f"[green]✓[/green] {selected['name']} API key saved!\n"
+        "\n"
+        "Try it out:\n"
+        "  [cyan]wtf show the weather in SF[/cyan]\n"
+    )
 
 
 def _show_memories() -> None:
     """Display all stored memories."""
+    from wtf.conversation.memory import load_memories
+
     memories = load_memories()
     if not memories:
         console.print("[yellow]No memories stored yet[/yellow]")
@@ -928,19 +893,21 @@ def _show_memories() -> None:
         console.print("  [cyan]wtf remember I use emacs[/cyan]")
         console.print("  [cyan]wtf remember I prefer npm over yarn[/cyan]")
     else:
-        console.print("[bold]Memories:[/bold]")
-        console.print()
+        lines = ["[bold]Memories:[/bold]", ""]
         for key, memory_data in memories.items():
             value = memory_data.get("value")
             timestamp = memory_data.get("timestamp", "")
             if timestamp:
-                timestamp = timestamp.split("T")[0]  # Just date
-            console.print(f"  [cyan]{key}:[/cyan] {value} [dim]({timestamp})[/dim]")
-        console.print()
+                timestamp = timestamp.partition("T")[0]  # Just date
+            lines.append(f"  [cyan]{key}:[/cyan] {value} [dim]({timestamp})[/dim]")
+        lines.append("")
+        console.print('\n'.join(lines))
 
 
 def _clear_memories() -> None:
     """Clear all stored memories."""
+    from wtf.conversation.memory import load_memories, clear_memories
+
     memories = load_memories()
     if not memories:
         console.print("[yellow]No memories to clear[/yellow]")
@@ -952,11 +919,10 @@ def _clear_memories() -> None:
 
 def _remember_fact(query: str) -> None:
     """Parse and remember a fact from the query."""
+    from wtf.conversation.memory import save_memory
+
     # Remove "remember" and common filler words
-    fact = query.lower()
-    for word in ["wtf", "remember", "that", "i", "we", "you"]:
-        fact = re.sub(r'\b' + re.escape(word) + r'\b', '', fact)
-    fact = fact.strip()
+    fact = _FILLER_RE.sub('', query.lower()).strip()
 
     if not fact:
         console.print("[yellow]What should I remember[/yellow]")
@@ -974,6 +940,24 @@ def _remember_fact(query: str) -> None:
     console.print()
 
 
+# Tool names that identify the memory key for "use X" facts, matched by
+# substring in X so variants like gvim or emacsclient count too
+_FACT_TOOL_WORDS = {
+    "emacs": "editor", "vim": "editor", "nvim": "editor", "neovim": "editor",
+    "npm": "package_manager", "yarn": "package_manager", "pnpm": "package_manager",
+    "zsh": "shell", "bash": "shell",
+}
+# Category words, which may appear anywhere in the fact ("my editor ...")
+_FACT_CATEGORY_WORDS = {
+    "editor": "editor",
+    "package": "package_manager",
+    "shell": "shell",
+    "python": "python_version",
+}
+# When several keys match, the first one here wins
+_FACT_KEY_PRIORITY = ("editor", "package_manager", "shell", "python_version")
+
+
 def _parse_memory_fact(fact: str) -> tuple[str, str]:
     """Parse a fact string into key and value.
 
@@ -990,16 +974,12 @@ def _parse_memory_fact(fact: str) -> tuple[str, str]:
         parts = fact.split("use", 1)
         if len(parts) == 2:
             value = parts[1].strip()
-            # Guess key from context
-            if "editor" in fact or "emacs" in value or "vim" in value:
-                key = "editor"
-            elif "package" in fact or "npm" in value or "yarn" in value:
-                key = "package_manager"
-            elif "shell" in fact or "zsh" in value or "bash" in value:
-                key = "shell"
-            elif "python" in fact:
-                key = "python_version"
-            else:
+            # Guess key from context: tool names only count in what is
+            # used ("with npm use exact versions" isn't about npm itself)
+            found = {k for tool, k in _FACT_TOOL_WORDS.items() if tool in value}
+            found.update(k for word, k in _FACT_CATEGORY_WORDS.items() if word in fact)
+            key = next((k for k in _FACT_KEY_PRIORITY if k in found), None)
+            if key is None:
                 key = parts[0].strip().replace(" ", "_") or "preference"
 
     elif "prefer" in fact:
@@ -1021,6 +1001,8 @@ def _parse_memory_fact(fact: str) -> tuple[str, str]:
 
 def _forget_memory_by_key(key: str) -> None:
     """Forget a specific memory by exact key."""
+    from wtf.conversation.memory import load_memories, delete_memory
+
     memories = load_memories()
     if not memories:
         console.print("[yellow]No memories to forget[/yellow]")
@@ -1043,6 +1025,8 @@ def _forget_memory_by_key(key: str) -> None:
 
 def _forget_memory(query: str) -> None:
     """DEPRECATED: Old natural language forget function. Use _forget_memory_by_key instead."""
+    from wtf.conversation.memory import load_memories, delete_memory
+
     memories = load_memories()
     if not memories:
         console.print("[yellow]No memories to forget[/yellow]")
@@ -1050,11 +1034,13 @@ def _forget_memory(query: str) -> None:
         return
 
     query_lower = query.lower()
+    query_words = query_lower.split()
 
-    # Find matching memory keys
+    # Find matching memory keys (lowercase each key once)
     matches = []
     for key in memories.keys():
-        if key.lower() in query_lower or any(word in key.lower() for word in query_lower.split()):
+        key_lower = key.lower()
+        if key_lower in query_lower or any(word in key_lower for word in query_words):
             matches.append(key)
 
     if not matches:
@@ -1077,6 +1063,15 @@ def _forget_memory(query: str) -> None:
         console.print()
 
 
+def _start_setup_wizard(query: str) -> bool:
+    """Run the setup wizard for a natural-language setup request."""
+    console.print()
+    console.print("[cyan]I'll run the setup wizard to change your configuration.[/cyan]")
+    console.print()
+    run_setup_wizard()
+    return True
+
+
 def handle_setup_command(query: str) -> bool:
     """Check if query is a setup/configuration command and handle it.
 
@@ -1086,27 +1081,8 @@ def handle_setup_command(query: str) -> bool:
     Returns:
         True if handled as setup command, False otherwise
     """
-    query_lower = query.lower().strip()
-
-    # Patterns that indicate wanting to run setup/reconfigure
-    has_model_keywords = ("provider" in query_lower or "ai" in query_lower or "model" in query_lower)
-    has_known_models = any(name in query_lower for name in ["claude", "gpt", "gemini", "openai", "anthropic", "google"])
-
-    setup_patterns = [
-        "change" in query_lower and (has_model_keywords or has_known_models),
-        "switch" in query_lower and (has_model_keywords or has_known_models or "to" in query_lower),
-        "use" in query_lower and ("different" in query_lower or "another" in query_lower) and (has_model_keywords or has_known_models),
-        "reconfigure" in query_lower,
-        "setup" in query_lower and not "--setup" in query,  # Natural language, not flag
-        "reset" in query_lower and ("config" in query_lower or "settings" in query_lower or "everything" in query_lower),
-    ]
-
-    if any(setup_patterns):
-        console.print()
-        console.print("[cyan]I'll run the setup wizard to change your configuration.[/cyan]")
-        console.print()
-        run_setup_wizard()
-        return True
+    if _INTENT_RE.match(query.lower().strip()):
+        return _start_setup_wizard(query)
 
     return False
 
@@ -1123,6 +1099,7 @@ def _setup_hook(hook_name: str, setup_func) -> None:
         hook_name: Human-readable hook name (e.g., "error", "command-not-found")
         setup_func: The setup function to call
     """
+    from wtf.context.shell import detect_shell
     from wtf.setup.hooks import get_shell_config_file
 
     shell = detect_shell()
@@ -1141,6 +1118,95 @@ def _setup_hook(hook_name: str, setup_func) -> None:
     console.print()
 
 
+class _LineStream:
+    """Print streamed response text through the console a line at a time.
+
+    Whole lines keep rich's wrapping; a partial line waits for its newline
+    (or close()). Markup is not parsed: a tag can be split across lines
+    that are printed separately, and model text may contain brackets.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self.started = False
+
+    def write(self, chunk: str) -> None:
+        self.started = True
+        lines, newline, self._pending = (self._pending + chunk).rpartition("\n")
+        if newline:
+            console.print(lines, markup=False)
+
+    def close(self) -> None:
+        if self._pending:
+            console.print(self._pending, markup=False)
+            self._pending = ""
+
+
+def _render_run_command(arguments: Dict[str, Any], result: Dict[str, Any]) -> List[str]:
+    """Render a run_command call as the command followed by its output."""
+    cmd = arguments.get("command", "")
+    output = result.get("output", "")
+    exit_code = result.get("exit_code", 0)
+
+    lines = [f"[dim]$[/dim] [cyan]{cmd}[/cyan]"]
+    if output and not output.isspace():
+        # Add "│ " (box-drawing character) prefix, dim the entire output
+        # with one span so the markup is parsed once, not per line
+        lines.append("[dim]" + '\n'.join("│ " + line for line in output.split('\n')) + "[/dim]")
+    # Only show exit code if it's actually an error AND the output doesn't already explain it
+    # (e.g., "nothing to commit" is self-explanatory, no need for "Exit code: 1")
+    if exit_code != 0 and exit_code != 1:
+        lines.append(f"[yellow]Exit code: {exit_code}[/yellow]")
+    return lines
+
+
+def _render_write_file(arguments: Dict[str, Any], result: Dict[str, Any]) -> List[str]:
+    """Render a write_file call as a one-line success or failure note."""
+    file_path = arguments.get("file_path", "")
+    if result.get("success"):
+        action = result.get("action", "wrote")
+        return [f"[green]✓[/green] {action.capitalize()} [cyan]{file_path}[/cyan]"]
+    error = result.get("error", "Unknown error")
+    return [f"[red]✗[/red] Failed to write {file_path}: {error}"]
+
+
+def _render_edit_file(arguments: Dict[str, Any], result: Dict[str, Any]) -> List[str]:
+    """Render an edit_file call as a one-line success or failure note."""
+    file_path = arguments.get("file_path", "")
+    if result.get("success"):
+        return [f"[green]✓[/green] Edited [cyan]{file_path}[/cyan]"]
+    error = result.get("error", "Unknown error")
+    return [f"[red]✗[/red] Failed to edit {file_path}: {error}"]
+
+
+# Tools whose results are shown to the user; every other tool is internal
+_TOOL_RENDERERS = {
+    "run_command": _render_run_command,
+    "write_file": _render_write_file,
+    "edit_file": _render_edit_file,
+}
+
+
+def _render_tool_call(tool_call: Dict[str, Any]) -> List[str]:
+    """
+    Render the user-facing output of one tool call as markup lines.
+
+    Args:
+        tool_call: Tool call dict with name, arguments and result
+
+    Returns:
+        Lines to print (ending with a blank line), or [] for internal tools
+    """
+    renderer = _TOOL_RENDERERS.get(tool_call["name"])
+    tool_result = tool_call["result"]
+    if renderer is None or not tool_result.get("should_print", False):
+        return []
+
+    lines = renderer(tool_call["arguments"], tool_result)
+    lines.append("")
+    return lines
+
+
 def handle_query_with_tools(query: str, config: Dict[str, Any]) -> None:
     """
     Handle a user query using the tool-based agent approach.
@@ -1155,16 +1221,43 @@ def handle_query_with_tools(query: str, config: Dict[str, Any]) -> None:
     if handle_setup_command(query):
         return
 
-    # Gather context
-    with console.status("🔍 Gathering context...", spinner="dots"):
-        commands, _ = get_shell_history(
-            count=config.get('behavior', {}).get('context_history_size', 5)
-        )
-        git_status = get_git_status()
-        env_context = get_environment_context()
-        memories = load_memories()
+    from concurrent.futures import ThreadPoolExecutor
+    from wtf.context.shell import get_shell_history, detect_shell
+    from wtf.context.git import get_git_status
+    from wtf.context.env import get_environment_context, build_tool_env_context
+    from wtf.ai.prompts import build_system_prompt, build_context_prompt
+    from wtf.ai.client import query_ai_with_tools
+    from wtf.ai.errors import InvalidAPIKeyError
+    from wtf.ai.tools import (
+        UserCancelledError,
+        PREFETCH_COMMANDS,
+        PREFETCH_GIT_COMMANDS,
+        start_prefetch,
+        clear_prefetch,
+    )
+    from wtf.core.permissions import load_allowlist, load_denylist, should_auto_execute
+    from wtf.conversation.memory import load_memories
+    from wtf.conversation.history import append_to_history, get_recent_conversations
+
+    # Gather context. The sources are independent and mostly waiting on
+    # files and subprocesses, so read them concurrently.
+    with _status("🔍 Gathering context..."):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            history_future = executor.submit(
+                get_shell_history,
+                count=config.get('behavior', {}).get('context_history_size', 5)
+            )
+            git_future = executor.submit(get_git_status)
+            env_future = executor.submit(get_environment_context)
+            memories_future = executor.submit(load_memories)
+            shell_future = executor.submit(detect_shell)
+
+            commands, _ = history_future.result()
+            git_status = git_future.result()
+            env_context = env_future.result()
+            memories = memories_future.result()
+            shell_type = shell_future.result()
         tool_env_context = build_tool_env_context(env_context, git_status)
-        shell_type = detect_shell()
 
     # Build prompts
     system_prompt = build_system_prompt()
@@ -1172,138 +1265,241 @@ def handle_query_with_tools(query: str, config: Dict[str, Any]) -> None:
     context_prompt = build_context_prompt(commands, git_status, env_context, memories, shell_type, recent_convos)
     full_prompt = f"{context_prompt}\n\nUSER QUERY:\n{query}"
 
+    # Speculatively run the read-only commands the agent usually starts with,
+    # so they finish while the model is thinking. Only commands run_command
+    # would execute without asking qualify, so the denylist and
+    # auto_allow_readonly are respected.
+    allowlist = load_allowlist()
+    denylist = load_denylist()
+    start_prefetch([
+        cmd for cmd in PREFETCH_COMMANDS + (PREFETCH_GIT_COMMANDS if git_status else [])
+        if should_auto_execute(cmd, allowlist, denylist, config) == "auto"
+    ])
+
     try:
         # Query AI with tools
         # Note: We don't use a spinner here because it conflicts with permission prompts
-        console.print()
-        console.print("[dim]🤖 Thinking...[/dim]")
-        result = query_ai_with_tools(
-            prompt=full_prompt,
-            config=config,
-            system_prompt=system_prompt,
-            max_iterations=20,
-            env_context=tool_env_context
-        )
+        _fast_print()
+        _fast_print("🤖 Thinking...", "dim")
+
+        # Show tool results and response text as they arrive, collecting
+        # the commands run for history on the way
+        run_commands: List[str] = []
+        shown_tool_calls = 0
+        output_started = False
+        response_stream = _LineStream()
+
+        def start_output() -> None:
+            # Blank line between "Thinking..." and the first real output
+            nonlocal output_started
+            if not output_started:
+                output_started = True
+                _fast_print()
+
+        def show_text(chunk: str) -> None:
+            start_output()
+            response_stream.write(chunk)
+
+        def show_tool_call(tool_call: Dict[str, Any]) -> None:
+            nonlocal shown_tool_calls
+            shown_tool_calls += 1
+            if tool_call["name"] == "run_command":
+                run_commands.append(tool_call["arguments"].get("command", ""))
+            tool_output = _render_tool_call(tool_call)
+            if tool_output:
+                start_output()
+                console.print('\n'.join(tool_output))
 
-        # Process tool calls and print outputs
-        console.print()
-
-        # Print user-facing tool outputs
-        for tool_call in result["tool_calls"]:
-            tool_name = tool_call["name"]
-            tool_result = tool_call["result"]
-
-            # run_command outputs
-            if tool_name == "run_command" and tool_result.get("should_print", False):
-                cmd = tool_call["arguments"].get("command", "")
-                output = tool_result.get("output", "")
-                exit_code = tool_result.get("exit_code", 0)
-
-                console.print(f"[dim]$[/dim] [cyan]{cmd}[/cyan]")
-                if output.strip():
-                    # Add "│ " (box-drawing character) prefix, dim the entire output
-                    indented_output = '\n'.join(f"[dim]│ {line}[/dim]" for line in output.split('\n'))
-                    console.print(indented_output)
-                # Only show exit code if it's actually an error AND the output doesn't already explain it
-                # (e.g., "nothing to commit" is self-explanatory, no need for "Exit code: 1")
-                if exit_code != 0 and exit_code != 1:
-                    console.print(f"[yellow]Exit code: {exit_code}[/yellow]")
-                console.print()
-
-            # write_file outputs
-            elif tool_name == "write_file" and tool_result.get("should_print", False):
-                file_path = tool_call["arguments"].get("file_path", "")
-                action = tool_result.get("action", "wrote")
-                if tool_result.get("success"):
-                    console.print(f"[green]✓[/green] {action.capitalize()} [cyan]{file_path}[/cyan]")
-                else:
-                    error = tool_result.get("error", "Unknown error")
-                    console.print(f"[red]✗[/red] Failed to write {file_path}: {error}")
-                console.print()
-
-            # edit_file outputs
-            elif tool_name == "edit_file" and tool_result.get("should_print", False):
-                file_path = tool_call["arguments"].get("file_path", "")
-                if tool_result.get("success"):
-                    console.print(f"[green]✓[/green] Edited [cyan]{file_path}[/cyan]")
-                else:
-                    error = tool_result.get("error", "Unknown error")
-                    console.print(f"[red]✗[/red] Failed to edit {file_path}: {error}")
-                console.print()
-
-        # Print final agent response
-        response_text = result.get("response", "")
-        if response_text:
-            console.print(response_text)
-        else:
-            # Debug: show what we got
-            console.print("[dim]No response text. Debug info:[/dim]")
-            console.print(f"[dim]Tool calls: {len(result['tool_calls'])}[/dim]")
-            console.print(f"[dim]Iterations: {result.get('iterations', 0)}[/dim]")
-        console.print()
+        try:
+            result = query_ai_with_tools(
+                prompt=full_prompt,
+                config=config,
+                system_prompt=system_prompt,
+                max_iterations=20,
+                env_context=tool_env_context,
+                on_text=show_text,
+                on_tool_call=show_tool_call
+            )
+        finally:
+            clear_prefetch()
+            # Show whatever arrived, even if the stream broke off
+            response_stream.close()
+        start_output()
+
+        # Nothing was streamed (e.g. a client that doesn't call back), so
+        # show the collected results now
+        if not shown_tool_calls:
+            for tool_call in result["tool_calls"]:
+                show_tool_call(tool_call)
+
+        if not response_stream.started:
+            response_text = result.get("response", "")
+            if response_text:
+                console.print(response_text)
+            else:
+                # Debug: show what we got
+                console.print(
+                    "[dim]No response text. Debug info:\n"
+                    f"Tool calls: {len(result['tool_calls'])}\n"
+                    f"Iterations: {result.get('iterations', 0)}[/dim]"
+                )
+        _fast_print()
 
         # Log to history
         append_to_history({
             "query": query,
             "response": result["response"],
-            "commands": [tc["arguments"].get("command", "") for tc in result["tool_calls"] if tc["name"] == "run_command"],
+            "commands": run_commands,
             "exit_code": 0
         })
 
     except UserCancelledError as e:
         # User said "no" to a command - exit gracefully with their message
-        console.print()
-        console.print(f"[yellow]{e}[/yellow]")
-        console.print()
+        console.print(f"\n[yellow]{e}[/yellow]\n")
         return  # Don't log as error
 
     except Exception as e:
-        console.print()
-        console.print(f"[red]Error:[/red] {e}")
-        console.print()
-        if "API" in str(e) or "key" in str(e).lower():
-            console.print("[yellow]Tip:[/yellow] Make sure your API key is set correctly.")
-            console.print("  Run [cyan]wtf --setup[/cyan] to reconfigure.")
+        error_msg = str(e)
+        error_output = ["", f"[red]Error:[/red] {error_msg}", ""]
+        from llm import NeedsKeyException
+        if isinstance(e, (InvalidAPIKeyError, NeedsKeyException)) or _API_KEY_HINT_RE.search(error_msg):
+            error_output.append("[yellow]Tip:[/yellow] Make sure your API key is set correctly.")
+            error_output.append("  Run [cyan]wtf --setup[/cyan] to reconfigure.")
+        console.print('\n'.join(error_output))
 
         append_to_history({
             "query": query,
-            "response": str(e),
+            "response": error_msg,
             "commands": [],
             "exit_code": 1
         })
 
 
 
-def _parse_arguments():
-    """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
-        add_help=False,  # We'll handle --help ourselves
-        description="wtf - Because working in the terminal often gets you asking wtf"
+# Boolean flags -> attribute name on the parsed arguments
+_BOOL_FLAGS = {
+    '--help': 'help', '-h': 'help',                         # Show help message
+    '--version': 'version', '-v': 'version',                # Show version
+    '--config': 'config',                                   # Show config file location
+    '--verbose': 'verbose',                                 # Show diagnostic info
+    '--reset': 'reset',                                     # Reset config to defaults
+    '--setup': 'setup',                                     # Run setup wizard
+    '--setup-search': 'setup_search',                       # Setup web search provider
+    '--setup-error-hook': 'setup_error_hook',               # Setup error hook
+    '--setup-not-found-hook': 'setup_not_found_hook',       # Setup not-found hook
+    '--remove-hooks': 'remove_hooks',                       # Remove shell hooks
+    '--upgrade': 'upgrade', '--update': 'upgrade',          # Upgrade wtf and AI model plugins
+}
+
+# Flags that take a value (--model X or --model=X) -> attribute name
+_VALUE_FLAGS = {
+    '--model': 'model',        # Override AI model (e.g., gpt-4, claude-3-5-sonnet)
+    '--provider': 'provider',  # Override AI provider (anthropic, openai, google)
+}
+
+_NEGATIVE_NUMBER_RE = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+def _looks_like_flag(arg: str) -> bool:
+    """Check if an argument is an option rather than part of the query."""
+    return (
+        arg.startswith('-') and arg != '-' and ' ' not in arg
+        and not _NEGATIVE_NUMBER_RE.match(arg)
     )
 
-    # Add known flags
-    parser.add_argument('--help', '-h', action='store_true', help='Show help message')
-    parser.add_argument('--version', '-v', action='store_true', help='Show version')
-    parser.add_argument('--config', action='store_true', help='Open config file')
-    parser.add_argument('--model', type=str, help='Override AI model (e.g., gpt-4, claude-3-5-sonnet)')
-    parser.add_argument('--provider', type=str, help='Override AI provider (anthropic, openai, google)')
-    parser.add_argument('--verbose', action='store_true', help='Show diagnostic info')
-    parser.add_argument('--reset', action='store_true', help='Reset config to defaults')
-    parser.add_argument('--setup', action='store_true', help='Run setup wizard')
-    parser.add_argument('--setup-search', action='store_true', help='Setup web search provider')
-    parser.add_argument('--setup-error-hook', action='store_true', help='Setup error hook')
-    parser.add_argument('--setup-not-found-hook', action='store_true', help='Setup not-found hook')
-    parser.add_argument('--remove-hooks', action='store_true', help='Remove shell hooks')
-    parser.add_argument('--upgrade', '--update', action='store_true', help='Upgrade wtf and all AI model plugins')
 
-    # Collect the rest as the user query
-    parser.add_argument('query', nargs='*', help='Your query for wtf')
+def _usage_error(message: str) -> None:
+    """Report a command line error and exit with status 2."""
+    sys.stderr.write(f"usage: wtf [options] [query ...]\nwtf: error: {message}\n")
+    sys.exit(2)
+
+
+def _expand_long_flag(flag: str) -> Optional[str]:
+    """
+    Resolve an abbreviated long flag (e.g. --verb) to the full flag name.
+
+    Args:
+        flag: A '--' flag without any '=value' part
+
+    Returns:
+        The full flag name, or None if no known flag starts with it
+    """
+    matches = [
+        known for known in (*_BOOL_FLAGS, *_VALUE_FLAGS)
+        if known.startswith('--') and known.startswith(flag)
+    ]
+    if len(matches) > 1:
+        _usage_error(f"ambiguous option: {flag} could match {', '.join(matches)}")
+    return matches[0] if matches else None
+
+
+def _parse_arguments(argv: Optional[List[str]] = None) -> SimpleNamespace:
+    """
+    Parse command line arguments.
 
-    return parser.parse_args()
+    Known flags may appear anywhere; every other word is collected as the
+    query. Everything after '--' is part of the query. As with argparse,
+    long flags may be shortened to any unique prefix (--verb) and short
+    flags may be combined (-hv).
+
+    Args:
+        argv: Arguments to parse (default: sys.argv[1:])
+
+    Returns:
+        Namespace with one attribute per flag, plus query (list of words)
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    args = SimpleNamespace(query=[], **dict.fromkeys(_BOOL_FLAGS.values(), False))
+    for attr in _VALUE_FLAGS.values():
+        setattr(args, attr, None)
+    unrecognized = []
+
+    remaining = iter(argv)
+    for original in remaining:
+        arg = original
+        flag, has_value, value = arg.partition('=')
+        if flag.startswith('--') and len(flag) > 2 and flag not in _BOOL_FLAGS and flag not in _VALUE_FLAGS:
+            expanded = _expand_long_flag(flag)
+            if expanded:
+                flag = expanded
+                arg = flag + has_value + value
+        elif (
+            len(arg) > 2 and arg[0] == '-' and arg[1] != '-'
+            and all(f'-{c}' in _BOOL_FLAGS for c in arg[1:])
+        ):
+            for c in arg[1:]:
+                setattr(args, _BOOL_FLAGS[f'-{c}'], True)
+            continue
+
+        if arg in _BOOL_FLAGS:
+            setattr(args, _BOOL_FLAGS[arg], True)
+            continue
+
+        if flag in _VALUE_FLAGS:
+            if not has_value:
+                value = next(remaining, None)
+                if value is None or _looks_like_flag(value):
+                    _usage_error(f"argument {flag}: expected one argument")
+            setattr(args, _VALUE_FLAGS[flag], value)
+        elif arg == '--':
+            args.query.extend(remaining)
+        elif _looks_like_flag(arg):
+            unrecognized.append(original)
+        else:
+            args.query.append(arg)
+
+    if unrecognized:
+        _usage_error(f"unrecognized arguments: {' '.join(unrecognized)}")
+
+    return args
 
 
 def _handle_config_flag() -> None:
     """Handle --config flag to show configuration file location."""
+    from wtf.core.config import get_config_dir
+
     config_dir = get_config_dir()
     config_file = config_dir / "config.json"
     console.print()
@@ -1325,6 +1521,8 @@ def _handle_reset_flag() -> None:
     """Handle --reset flag to delete all configuration."""
     from pathlib import Path
     import shutil
+    from rich.prompt import Confirm
+    from wtf.core.config import get_config_dir
 
     config_dir = Path(get_config_dir())
 
@@ -1360,6 +1558,12 @@ def _handle_reset_flag() -> None:
 
 def _handle_hooks_flags(args) -> None:
     """Handle hook-related flags (--setup-error-hook, --setup-not-found-hook, --remove-hooks)."""
+    if not (args.setup_error_hook or args.setup_not_found_hook or args.remove_hooks):
+        return
+
+    from wtf.context.shell import detect_shell
+    from wtf.setup.hooks import setup_error_hook, setup_not_found_hook, remove_hooks
+
     if args.setup_error_hook:
         _setup_hook("error", setup_error_hook)
         sys.exit(0)
@@ -1381,6 +1585,23 @@ def _handle_hooks_flags(args) -> None:
         sys.exit(0)
 
 
+def _get_upgrade_packages() -> List[str]:
+    """Get wtf-ai, llm and every llm plugin that is currently installed.
+
+    Returns:
+        Sorted list of distribution names to upgrade
+    """
+    from importlib import metadata
+
+    packages = {"wtf-ai", "llm"}
+    for dist in metadata.distributions():
+        # Normalize e.g. "llm_anthropic" / "LLM-Anthropic" to "llm-anthropic"
+        name = re.sub(r'[-_.]+', '-', dist.metadata.get("Name") or "").lower()
+        if name.startswith("llm-"):
+            packages.add(name)
+    return sorted(packages)
+
+
 def _handle_upgrade_flag() -> None:
     """Handle --upgrade flag to upgrade wtf and all AI model plugins."""
     import subprocess
@@ -1389,39 +1610,36 @@ def _handle_upgrade_flag() -> None:
     console.print("[bold]Upgrading wtf and AI model plugins...[/bold]")
     console.print()
     
-    # Packages to upgrade: wtf-ai and all llm plugins
-    packages = [
-        "wtf-ai",
-        "llm",
-        "llm-anthropic",
-        "llm-gemini", 
-        "llm-ollama",
-    ]
-    
-    for package in packages:
-        console.print(f"[dim]Upgrading {package}...[/dim]")
-        try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "install", "--upgrade", package],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                # Extract version from output if possible
+    # Only upgrade what's installed - picks up any llm plugin the user added
+    packages = _get_upgrade_packages()
+    console.print(f"[dim]Upgrading {', '.join(packages)}...[/dim]")
+
+    # One pip run resolves all packages together instead of once per package
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", "install", "--upgrade", *packages],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode == 0:
+            for package in packages:
                 console.print(f"  [green]✓[/green] {package} upgraded")
-            else:
-                console.print(f"  [yellow]⚠[/yellow] {package} - {result.stderr.strip() or 'failed'}")
-        except Exception as e:
-            console.print(f"  [red]✗[/red] {package} - {e}")
+        else:
+            console.print(f"  [yellow]⚠[/yellow] {result.stderr.strip() or 'pip install failed'}")
+    except Exception as e:
+        console.print(f"  [red]✗[/red] {e}")
     
     console.print()
     console.print("[green]✓[/green] Upgrade complete!")
     console.print()
     
-    # Show new version
-    from wtf import __version__
-    # Reload to get new version (won't work in same process, but show current)
-    console.print(f"[dim]Current version: {__version__}[/dim]")
+    # The running process still has the old code loaded, so read the version
+    # from the freshly installed package metadata instead of wtf.__version__
+    from importlib import metadata
+    try:
+        console.print(f"[dim]Installed version: {metadata.version('wtf-ai')}[/dim]")
+    except metadata.PackageNotFoundError:
+        pass
     console.print("[dim]Restart your terminal to use the new version.[/dim]")
     console.print()
     sys.exit(0)
@@ -1429,6 +1647,8 @@ def _handle_upgrade_flag() -> None:
 
 def _load_or_setup_config():
     """Load configuration, running setup wizard if needed."""
+    from wtf.core.config import config_exists, load_config
+
     # Check if setup is needed (first run)
     if not config_exists():
         console.print()
@@ -1448,7 +1668,7 @@ def _load_or_setup_config():
 def _handle_query(args, config) -> None:
     """Handle user query or show helpful message."""
     if args.query:
-        query = ' '.join(args.query)
+        query = args.query[0] if len(args.query) == 1 else ' '.join(args.query)
         # Set verbose/debug mode via environment variable
         if args.verbose:
             os.environ['WTF_DEBUG'] = '1'
@@ -1465,6 +1685,8 @@ def _handle_query(args, config) -> None:
         handle_query_with_tools(query, config)
     elif args.model:
         # --model without query = change default model permanently
+        from wtf.core.config import save_config
+
         old_model = config.get('api', {}).get('model', 'unknown')
         config['api'] = config.get('api', {})
         config['api']['model'] = args.model
@@ -1483,38 +1705,40 @@ def _handle_query(args, config) -> None:
         console.print("  [cyan]wtf --help[/cyan]")
 
 
+# Flags that run a single action and exit, checked in this order
+_FLAG_HANDLERS = (
+    ("help", print_help),
+    ("version", print_version),
+    ("upgrade", _handle_upgrade_flag),
+    ("config", _handle_config_flag),
+    ("reset", _handle_reset_flag),
+    ("setup", run_setup_wizard),
+    ("setup_search", run_search_setup_wizard),
+)
+
+
 def main() -> None:
     """Main entry point for wtf CLI."""
-    args = _parse_arguments()
+    # Fast path for a bare `wtf --help` / `wtf --version`
+    argv = sys.argv[1:]
+    if len(argv) == 1:
+        if argv[0] in ('--help', '-h'):
+            print_help()
+            sys.exit(0)
+        if argv[0] in ('--version', '-v'):
+            print_version()
+            sys.exit(0)
+
+    args = _parse_arguments(argv)
 
     # Handle flags
-    if args.help:
-        print_help()
-        sys.exit(0)
-
-    if args.version:
-        print_version()
-        sys.exit(0)
-
-    if args.config:
-        _handle_config_flag()
-
-    if args.reset:
-        _handle_reset_flag()
-
-    if args.setup:
-        run_setup_wizard()
-        sys.exit(0)
-
-    if args.setup_search:
-        run_search_setup_wizard()
-        sys.exit(0)
+    for name, handler in _FLAG_HANDLERS:
+        if getattr(args, name):
+            handler()
+            sys.exit(0)
 
     _handle_hooks_flags(args)
 
-    if args.upgrade:
-        _handle_upgrade_flag()
-
     # Load or setup config
     config = _load_or_setup_config()
 
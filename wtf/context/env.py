@@ -1,6 +1,5 @@
 """Environment and project detection."""
 
-import os
 from pathlib import Path
 from typing import Dict, List, Any
 
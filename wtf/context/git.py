@@ -1,9 +1,7 @@
 """Git context gathering."""
 
-import os
 import subprocess
 from typing import Optional, Dict, Any
-from pathlib import Path
 
 
 def is_git_repo(path: str = ".") -> bool:
@@ -3,10 +3,17 @@
 import os
 import subprocess
 from enum import Enum
-from pathlib import Path
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 
+# Only the end of a history file is ever needed; read at most this much of it
+HISTORY_TAIL_BYTES = 64 * 1024
+
+# Last parsed history file: ((path, mtime_ns, size), commands, whole_file_read)
+_history_cache: Optional[Tuple[Tuple[str, int, int], List[str], bool]] = None
+
+
 class HistoryFailureReason(Enum):
     """Reasons why history gathering might fail."""
     FC_COMMAND_FAILED = "fc_failed"
@@ -17,10 +24,13 @@ class HistoryFailureReason(Enum):
     UNKNOWN = "unknown"
 
 
+@lru_cache(maxsize=1)
 def detect_shell() -> str:
     """
     Detect the current shell type.
 
+    The answer can't change during a run, so it is computed once per process.
+
     Returns:
         Shell type: "zsh", "bash", "fish", or "unknown"
     """
@@ -174,6 +184,54 @@ def parse_history_lines(lines: List[str], shell_type: str) -> List[str]:
     return commands
 
 
+def read_history_file(history_file: str, shell_type: str, count: int) -> List[str]:
+    """
+    Read the most recent commands from a history file.
+
+    Only the last HISTORY_TAIL_BYTES of the file are read, unless that is not
+    enough to find `count` commands. The parsed result is cached and reused
+    while the file's mtime and size are unchanged.
+
+    Args:
+        history_file: Path to the history file
+        shell_type: The shell type (selects the line parser)
+        count: Number of recent commands wanted
+
+    Returns:
+        Up to `count` most recent commands (oldest first)
+    """
+    global _history_cache
+
+    st = os.stat(history_file)
+    cache_key = (history_file, st.st_mtime_ns, st.st_size)
+
+    if _history_cache is not None and _history_cache[0] == cache_key:
+        _, commands, whole_file = _history_cache
+        if whole_file or len(commands) >= count:
+            return commands[-count:]
+
+    with open(history_file, 'rb') as f:
+        whole_file = st.st_size <= HISTORY_TAIL_BYTES
+        if not whole_file:
+            f.seek(st.st_size - HISTORY_TAIL_BYTES)
+        data = f.read()
+
+    if not whole_file:
+        # Drop the first line, the seek most likely landed in the middle of it
+        data = data.split(b'\n', 1)[1] if b'\n' in data else b''
+
+    commands = parse_history_lines(data.decode(errors='ignore').splitlines(), shell_type)
+
+    if not whole_file and len(commands) < count:
+        # Very long entries - fall back to reading everything
+        with open(history_file, 'r', errors='ignore') as f:
+            commands = parse_history_lines(f.readlines(), shell_type)
+        whole_file = True
+
+    _history_cache = (cache_key, commands, whole_file)
+    return commands[-count:]
+
+
 def get_shell_history(count: int = 5) -> Tuple[Optional[List[str]], Optional[HistoryFailureReason]]:
     """
     Get recent shell history with detailed failure reason.
@@ -223,17 +281,10 @@ def get_shell_history(count: int = 5) -> Tuple[Optional[List[str]], Optional[His
         return (None, HistoryFailureReason.FILE_NOT_FOUND)
 
     try:
-        with open(history_file, 'r', errors='ignore') as f:
-            lines = f.readlines()
-
-        if not lines:
-            return (None, HistoryFailureReason.EMPTY_HISTORY)
-
-        # Parse based on shell type
-        commands = parse_history_lines(lines, shell_type)
+        commands = read_history_file(history_file, shell_type, count)
 
         if commands:
-            return (commands[-count:], None)
+            return (commands, None)
         else:
             return (None, HistoryFailureReason.EMPTY_HISTORY)
 
@@ -32,9 +32,17 @@ def append_to_history(conversation: Dict[str, Any]) -> None:
     if "timestamp" not in conversation:
         conversation["timestamp"] = datetime.now().isoformat()
 
-    # Append to file
-    with open(history_path, 'a') as f:
-        f.write(json.dumps(conversation) + "\n")
+    # Append as one compact line through an O_APPEND fd. Each entry normally
+    # lands in a single write, which keeps concurrent wtf processes from
+    # mixing their lines; a short write is finished off rather than dropped
+    data = json.dumps(conversation, separators=(',', ':')).encode('utf-8') + b"\n"
+    fd = os.open(history_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
 
 
 def get_recent_conversations(count: int = 10) -> List[Dict[str, Any]]:
@@ -1,13 +1,19 @@
 """Memory system for user preferences."""
 
+import copy
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from wtf.core.config import get_config_dir
 
 
+# Last parsed memories file: ((path, mtime_ns, size), memories)
+_memories_cache: Optional[Tuple[Tuple[str, int, int], Dict[str, Any]]] = None
+
+
 def get_memory_path() -> Path:
     """
     Get path to memories.json file.
@@ -35,9 +41,7 @@ def save_memory(key: str, value: Any, confidence: float = 1.0) -> None:
         "timestamp": datetime.now().isoformat()
     }
 
-    memory_path = get_memory_path()
-    with open(memory_path, 'w') as f:
-        json.dump(memories, f, indent=2)
+    _write_memories(memories)
 
 
 def load_memories() -> Dict[str, Any]:
@@ -47,17 +51,47 @@ def load_memories() -> Dict[str, Any]:
     Returns:
         Dictionary of all memories
     """
+    global _memories_cache
     memory_path = get_memory_path()
 
-    if not memory_path.exists():
+    try:
+        st = os.stat(memory_path)
+    except OSError:
         return {}
 
+    # Reuse the last parse while the file is unchanged
+    cache_key = (str(memory_path), st.st_mtime_ns, st.st_size)
+    if _memories_cache is not None and _memories_cache[0] == cache_key:
+        # Deep copy: each memory is itself a dict callers may edit
+        return copy.deepcopy(_memories_cache[1])
+
     try:
         with open(memory_path, 'r') as f:
-            return json.load(f)
+            memories = json.load(f)
     except (json.JSONDecodeError, IOError):
         return {}
 
+    _memories_cache = (cache_key, memories)
+    return copy.deepcopy(memories)
+
+
+def _write_memories(memories: Dict[str, Any]) -> None:
+    """
+    Write memories to memories.json and refresh the load cache.
+
+    Args:
+        memories: Dictionary of all memories
+    """
+    global _memories_cache
+    memory_path = get_memory_path()
+    with open(memory_path, 'w') as f:
+        json.dump(memories, f, indent=2)
+
+    # Cache what was just written, so a rewrite that keeps the same size
+    # within the filesystem's mtime granularity can't serve stale data
+    st = os.stat(memory_path)
+    _memories_cache = ((str(memory_path), st.st_mtime_ns, st.st_size), copy.deepcopy(memories))
+
 
 def search_memories(query: str) -> Dict[str, Any]:
     """
@@ -95,16 +129,10 @@ def delete_memory(key: str) -> None:
 
     if key in memories:
         del memories[key]
-
-        memory_path = get_memory_path()
-        with open(memory_path, 'w') as f:
-            json.dump(memories, f, indent=2)
+        _write_memories(memories)
 
 
 def clear_memories() -> None:
     """Clear all memories."""
-    memory_path = get_memory_path()
-
     # Write empty dict
-    with open(memory_path, 'w') as f:
-        json.dump({}, f, indent=2)
+    _write_memories({})
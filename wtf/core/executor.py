@@ -1,11 +1,8 @@
 """Command execution with timeout and output capture."""
 
 import subprocess
-import time
 from typing import Tuple
 from rich.console import Console
-from rich.spinner import Spinner
-from rich.live import Live
 
 console = Console()
 
@@ -1,8 +1,10 @@
 """Permission system for command execution."""
 
 import json
-from typing import List, Dict, Any, Literal
-from pathlib import Path
+import os
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Literal, Optional, Tuple
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
@@ -11,6 +13,9 @@ from wtf.core.config import get_allowlist_path
 
 console = Console()
 
+# Last parsed allowlist file: ((path, mtime_ns, size), data)
+_allowlist_cache: Optional[Tuple[Tuple[str, int, int], Dict[str, Any]]] = None
+
 # Safe read-only commands that can auto-execute without permission
 SAFE_READONLY_COMMANDS = {
     # Command existence checks
@@ -85,25 +90,54 @@ SAFE_READONLY_COMMANDS = {
     "gunzip -l",
 }
 
+# One alternation of all safe prefixes, matched at the start of a command
+_SAFE_READONLY_RE = re.compile(
+    "|".join(re.escape(prefix.lower()) for prefix in SAFE_READONLY_COMMANDS)
+)
 
-def load_allowlist() -> List[str]:
+
+def _load_allowlist_data() -> Dict[str, Any]:
     """
-    Load allowed command patterns from allowlist.json.
+    Load allowlist.json, reusing the last parse while the file is unchanged.
+
+    Both lists live in this file and are checked for every command the
+    agent runs, so one parse serves both loaders.
 
     Returns:
-        List of command patterns that are allowed
+        Parsed file contents, or {} if the file is missing or invalid
     """
+    global _allowlist_cache
     allowlist_path = get_allowlist_path()
 
-    if not allowlist_path.exists():
-        return []
+    try:
+        st = os.stat(allowlist_path)
+    except OSError:
+        return {}
+
+    cache_key = (str(allowlist_path), st.st_mtime_ns, st.st_size)
+    if _allowlist_cache is not None and _allowlist_cache[0] == cache_key:
+        return _allowlist_cache[1]
 
     try:
         with open(allowlist_path, 'r') as f:
             data = json.load(f)
-            return data.get('patterns', [])
     except Exception:
-        return []
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    _allowlist_cache = (cache_key, data)
+    return data
+
+
+def load_allowlist() -> List[str]:
+    """
+    Load allowed command patterns from allowlist.json.
+
+    Returns:
+        List of command patterns that are allowed
+    """
+    return list(_load_allowlist_data().get('patterns', []))
 
 
 def load_denylist() -> List[str]:
@@ -113,17 +147,24 @@ def load_denylist() -> List[str]:
     Returns:
         List of command patterns that are denied
     """
-    allowlist_path = get_allowlist_path()
+    return list(_load_allowlist_data().get('denylist', []))
 
-    if not allowlist_path.exists():
-        return []
 
-    try:
-        with open(allowlist_path, 'r') as f:
-            data = json.load(f)
-            return data.get('denylist', [])
-    except Exception:
-        return []
+@lru_cache(maxsize=8)
+def _compile_patterns(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    """
+    Compile literal command patterns into one case-folded alternation.
+
+    Use .match() for prefix matching (allowlist) and .search() for
+    substring matching (denylist).
+
+    Args:
+        patterns: Command patterns as stored in allowlist.json
+
+    Returns:
+        Compiled regex
+    """
+    return re.compile("|".join(re.escape(p.lower().strip()) for p in patterns))
 
 
 def is_command_allowed(cmd: str, allowlist: List[str]) -> bool:
@@ -137,14 +178,9 @@ def is_command_allowed(cmd: str, allowlist: List[str]) -> bool:
     Returns:
         True if command matches an allowed pattern
     """
-    cmd_lower = cmd.lower().strip()
-
-    for pattern in allowlist:
-        pattern_lower = pattern.lower().strip()
-        if cmd_lower.startswith(pattern_lower):
-            return True
-
-    return False
+    if not allowlist:
+        return False
+    return _compile_patterns(tuple(allowlist)).match(cmd.lower().strip()) is not None
 
 
 def is_command_denied(cmd: str, denylist: List[str]) -> bool:
@@ -158,14 +194,9 @@ def is_command_denied(cmd: str, denylist: List[str]) -> bool:
     Returns:
         True if command matches a denied pattern
     """
-    cmd_lower = cmd.lower().strip()
-
-    for pattern in denylist:
-        pattern_lower = pattern.lower().strip()
-        if pattern_lower in cmd_lower:
-            return True
-
-    return False
+    if not denylist:
+        return False
+    return _compile_patterns(tuple(denylist)).search(cmd.lower().strip()) is not None
 
 
 def prompt_for_permission(
@@ -232,6 +263,7 @@ def add_to_allowlist(pattern: str) -> None:
     Args:
         pattern: Command pattern to allow
     """
+    global _allowlist_cache
     allowlist_path = get_allowlist_path()
 
     # Load current allowlist
@@ -250,6 +282,7 @@ def add_to_allowlist(pattern: str) -> None:
         # Save back
         with open(allowlist_path, 'w') as f:
             json.dump(data, f, indent=2)
+        _allowlist_cache = None
 
         console.print(f"[green]✓[/green] Added [cyan]{pattern}[/cyan] to allowlist")
 
@@ -303,18 +336,15 @@ def is_safe_readonly_command(cmd: str, config: Dict[str, Any] = None) -> bool:
         if not auto_allow:
             return False
 
-    cmd_lower = cmd.lower().strip()
-
     # Check if it starts with any safe prefix
-    for safe_prefix in SAFE_READONLY_COMMANDS:
-        if cmd_lower.startswith(safe_prefix.lower()):
-            # Additional safety checks
-            if is_command_chained(cmd):
-                return False
-            if has_output_redirection(cmd):
-                return False
+    if _SAFE_READONLY_RE.match(cmd.lower().strip()):
+        # Additional safety checks
+        if is_command_chained(cmd):
+            return False
+        if has_output_redirection(cmd):
+            return False
 
-            return True
+        return True
 
     return False
 
@@ -1,10 +1,13 @@
 """Detect and handle name collisions during installation."""
 
-import os
 import re
 from typing import Optional, Dict, List
 from pathlib import Path
 
+# "alias wtf=..." and "wtf() {" / "function wtf() {" definitions in rc files
+_ALIAS_RE = re.compile(r'^\s*alias\s+wtf\s*=')
+_FUNCTION_RE = re.compile(r'^\s*(function\s+)?wtf\s*\(\s*\)')
+
 
 def get_shell_config_files() -> List[Path]:
     """
@@ -47,7 +50,7 @@ def detect_wtf_collision() -> Optional[Dict[str, any]]:
 
             for i, line in enumerate(lines, 1):
                 # Check for alias wtf=
-                if re.match(r'^\s*alias\s+wtf\s*=', line):
+                if _ALIAS_RE.match(line):
                     return {
                         "type": "alias",
                         "location": str(config_file),
@@ -56,7 +59,7 @@ def detect_wtf_collision() -> Optional[Dict[str, any]]:
                     }
 
                 # Check for function wtf()
-                if re.match(r'^\s*(function\s+)?wtf\s*\(\s*\)', line):
+                if _FUNCTION_RE.match(line):
                     return {
                         "type": "function",
                         "location": str(config_file),
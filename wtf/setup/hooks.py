@@ -1,6 +1,5 @@
 """Shell hook setup for automatic wtf triggering."""
 
-import os
 from pathlib import Path
 from typing import Optional, Tuple
 from rich.console import Console
@@ -1,7 +1,5 @@
 """Security checks for commands."""
 
-from typing import List
-
 # Dangerous command patterns
 DANGEROUS_PATTERNS = [
     # Filesystem destruction